@@ -7,7 +7,7 @@ and boto3 SDK with proper pagination and rate limiting.
 
 import logging
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 from datetime import datetime
 from botocore.exceptions import ClientError
 from tqdm import tqdm
@@ -17,6 +17,12 @@ from utils.time_helpers import datetime_to_timestamp
 
 logger = logging.getLogger(__name__)
 
+# AWS requires WAF logging destinations in CloudWatch Logs to use this name prefix
+WAF_LOG_GROUP_PREFIX = 'aws-waf-logs'
+
+# Largest page size accepted by DescribeLogGroups
+DESCRIBE_LOG_GROUPS_PAGE_SIZE = 50
+
 
 class CloudWatchFetcher:
     """
@@ -34,12 +40,15 @@ class CloudWatchFetcher:
         self.region = region
         logger.info("CloudWatch Logs fetcher initialized")
 
-    def list_log_groups(self, prefix: str = "aws-waf-logs") -> List[Dict[str, Any]]:
+    def list_log_groups(self, prefix: str = WAF_LOG_GROUP_PREFIX) -> List[Dict[str, Any]]:
         """
         List CloudWatch log groups with a given prefix.
 
+        The prefix is applied server-side via ``logGroupNamePrefix`` so only
+        matching log groups are transferred.
+
         Args:
-            prefix (str): Log group name prefix (default: 'aws-waf-logs')
+            prefix (str): Log group name prefix (default: WAF_LOG_GROUP_PREFIX)
 
         Returns:
             List[Dict[str, Any]]: List of log group information
@@ -48,7 +57,10 @@ class CloudWatchFetcher:
 
         try:
             paginator = self.client.get_paginator('describe_log_groups')
-            page_iterator = paginator.paginate(logGroupNamePrefix=prefix)
+            page_iterator = paginator.paginate(
+                logGroupNamePrefix=prefix,
+                PaginationConfig={'PageSize': DESCRIBE_LOG_GROUPS_PAGE_SIZE}
+            )
 
             for page in page_iterator:
                 log_groups.extend(page.get('logGroups', []))
@@ -80,28 +92,53 @@ class CloudWatchFetcher:
         Returns:
             List[Dict[str, Any]]: List of log events
         """
+        log_events = []
+        for page in self.iter_log_events(log_group_name, start_time, end_time,
+                                         filter_pattern, max_results):
+            log_events.extend(page)
+        return log_events
+
+    def iter_log_events(self, log_group_name: str, start_time: datetime,
+                        end_time: datetime, filter_pattern: str = "",
+                        max_results: int = 10000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Fetch log events from a CloudWatch log group one API page at a time.
+
+        Callers can parse and store each page before the next one is requested,
+        so memory use is bounded by the page size rather than the time window.
+
+        Args:
+            log_group_name (str): Name of the CloudWatch log group
+            start_time (datetime): Start of time range
+            end_time (datetime): End of time range
+            filter_pattern (str): CloudWatch Logs filter pattern (optional)
+            max_results (int): Maximum number of results to fetch
+
+        Yields:
+            List[Dict[str, Any]]: Log events returned by one filter_log_events call
+        """
         logger.info(f"Fetching logs from CloudWatch log group: {log_group_name}")
         logger.info(f"Time range: {start_time.isoformat()} to {end_time.isoformat()}")
 
-        log_events = []
         start_time_ms = datetime_to_timestamp(start_time)
         end_time_ms = datetime_to_timestamp(end_time)
+        total_events = 0
 
-        try:
-            # Use filter_log_events for efficient querying
-            kwargs = {
-                'logGroupName': log_group_name,
-                'startTime': start_time_ms,
-                'endTime': end_time_ms,
-                'limit': 10000  # Max per request
-            }
+        # Use filter_log_events for efficient querying
+        kwargs = {
+            'logGroupName': log_group_name,
+            'startTime': start_time_ms,
+            'endTime': end_time_ms,
+            'limit': 10000  # Max per request
+        }
 
-            if filter_pattern:
-                kwargs['filterPattern'] = filter_pattern
+        if filter_pattern:
+            kwargs['filterPattern'] = filter_pattern
 
-            # Create progress bar
-            pbar = tqdm(desc="Fetching CloudWatch logs", unit=" events")
+        # Create progress bar
+        pbar = tqdm(desc="Fetching CloudWatch logs", unit=" events")
 
+        try:
             # Paginate through results
             next_token = None
             requests_made = 0
@@ -113,8 +150,10 @@ class CloudWatchFetcher:
                 response = self.client.filter_log_events(**kwargs)
                 events = response.get('events', [])
 
-                log_events.extend(events)
+                total_events += len(events)
                 pbar.update(len(events))
+                if events:
+                    yield events
 
                 # Rate limiting: CloudWatch Logs has 5 TPS limit per region
                 requests_made += 1
@@ -122,7 +161,7 @@ class CloudWatchFetcher:
                     time.sleep(1)
 
                 # Check if we've hit the max results limit
-                if len(log_events) >= max_results:
+                if total_events >= max_results:
                     logger.warning(f"Reached max results limit: {max_results}")
                     break
 
@@ -131,14 +170,13 @@ class CloudWatchFetcher:
                 if not next_token:
                     break
 
-            pbar.close()
-
-            logger.info(f"Fetched {len(log_events)} log events from CloudWatch")
-            return log_events
+            logger.info(f"Fetched {total_events} log events from CloudWatch")
 
         except ClientError as e:
             handle_aws_error(e, f"fetching logs from {log_group_name}")
-            return []
+
+        finally:
+            pbar.close()
 
     def get_log_streams(self, log_group_name: str,
                        start_time: Optional[datetime] = None,
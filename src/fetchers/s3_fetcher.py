@@ -6,21 +6,25 @@ log files with proper error handling and progress tracking.
 """
 
 import gzip
+import io
 import json
 import logging
-from typing import List, Dict, Any, Optional, Iterator
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple
 from datetime import datetime, timedelta
-from pathlib import Path
 from botocore.exceptions import ClientError
 from tqdm import tqdm
 import tempfile
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 from utils.aws_helpers import get_s3_client, handle_aws_error
+from utils.json_helpers import loads_json
 from utils.time_helpers import get_s3_prefix_for_date, get_daily_buckets
 
 logger = logging.getLogger(__name__)
 
+# Concurrent GetObject requests; S3 calls are latency-bound, not CPU-bound
+DEFAULT_DOWNLOAD_WORKERS = 16
+
 
 class S3Fetcher:
     """
@@ -31,7 +35,7 @@ class S3Fetcher:
         """
         Initialize the S3 fetcher.
         """
-        self.client = get_s3_client()
+        self.client = get_s3_client(max_pool_connections=DEFAULT_DOWNLOAD_WORKERS * 2)
         logger.info("S3 fetcher initialized")
 
     def list_objects(self, bucket: str, prefix: str = "",
@@ -112,6 +116,9 @@ class S3Fetcher:
         """
         Read and parse a WAF log file from S3.
 
+        The object is read into memory with GetObject rather than written to a
+        temporary file first; WAF log objects are small compressed batches.
+
         Args:
             bucket (str): S3 bucket name
             key (str): Object key
@@ -119,27 +126,20 @@ class S3Fetcher:
         Returns:
             List[Dict[str, Any]]: Parsed log entries
         """
-        log_entries = []
-
         try:
-            # Download the file
-            local_path = self.download_object(bucket, key)
-            if not local_path:
-                return []
+            logger.debug(f"Reading s3://{bucket}/{key}")
+            response = self.client.get_object(Bucket=bucket, Key=key)
+            data = response['Body'].read()
+        except ClientError as e:
+            handle_aws_error(e, f"downloading s3://{bucket}/{key}")
+            return []
 
+        try:
             # Determine if file is compressed
-            is_compressed = key.endswith('.gz')
+            if key.endswith('.gz'):
+                data = gzip.decompress(data)
 
-            # Read and parse the file
-            if is_compressed:
-                with gzip.open(local_path, 'rt', encoding='utf-8') as f:
-                    log_entries = self._parse_log_content(f)
-            else:
-                with open(local_path, 'r', encoding='utf-8') as f:
-                    log_entries = self._parse_log_content(f)
-
-            # Clean up temporary file
-            Path(local_path).unlink()
+            log_entries = self._parse_log_content(io.BytesIO(data))
 
             logger.debug(f"Read {len(log_entries)} log entries from {key}")
             return log_entries
@@ -148,6 +148,51 @@ class S3Fetcher:
             logger.error(f"Error reading log file {key}: {e}")
             return []
 
+    def iter_log_files(self, bucket: str, keys: Iterable[str],
+                       max_workers: int = DEFAULT_DOWNLOAD_WORKERS) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Download and parse log files concurrently, yielding each as it completes.
+
+        At most ``max_workers * 2`` files are in flight or buffered at once, so
+        a slow consumer does not cause every object to be held in memory.
+
+        Args:
+            bucket (str): S3 bucket name
+            keys (Iterable[str]): Object keys to read
+            max_workers (int): Maximum number of parallel download workers
+
+        Yields:
+            Tuple[str, List[Dict[str, Any]]]: Object key and its parsed log entries
+        """
+        keys = iter(keys)
+        max_pending = max_workers * 2
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+
+            def submit_next() -> bool:
+                key = next(keys, None)
+                if key is None:
+                    return False
+                pending[executor.submit(self.read_log_file, bucket, key)] = key
+                return True
+
+            while len(pending) < max_pending and submit_next():
+                pass
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    try:
+                        log_entries = future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing {key}: {e}")
+                        log_entries = []
+
+                    submit_next()
+                    yield key, log_entries
+
     def _parse_log_content(self, file_handle) -> List[Dict[str, Any]]:
         """
         Parse log content from a file handle.
@@ -177,6 +222,13 @@ class S3Fetcher:
 
     def _extract_json_objects(self, content: str) -> List[Any]:
         """Extract JSON objects from a string without requiring an array wrapper."""
+        # Fast path: standard WAF logging writes one JSON object per line
+        try:
+            return [loads_json(line) for line in content.split('\n') if line.strip()]
+        except json.JSONDecodeError:
+            # Multi-line (e.g. CloudWatch export) or partially corrupt content
+            pass
+
         decoder = json.JSONDecoder()
         objects: List[Any] = []
         idx = 0
@@ -212,7 +264,7 @@ class S3Fetcher:
 
         if isinstance(record, str):
             try:
-                decoded = json.loads(record)
+                decoded = loads_json(record)
                 return decoded if isinstance(decoded, dict) else None
             except json.JSONDecodeError as e:
                 logger.warning(f"Failed to parse log record string: {e}")
@@ -229,7 +281,7 @@ class S3Fetcher:
             return None
 
         try:
-            inner = json.loads(message)
+            inner = loads_json(message)
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to decode CloudWatch export message: {e}")
             return None
@@ -247,7 +299,7 @@ class S3Fetcher:
         return inner
 
     def fetch_logs(self, bucket: str, prefix: str, start_time: datetime,
-                  end_time: datetime, max_workers: int = 5) -> List[Dict[str, Any]]:
+                  end_time: datetime, max_workers: int = DEFAULT_DOWNLOAD_WORKERS) -> List[Dict[str, Any]]:
         """
         Fetch all WAF logs from S3 for a given time range.
 
@@ -270,35 +322,21 @@ class S3Fetcher:
         logger.info(f"Scanning {len(date_prefixes)} date-based prefixes")
 
         # Collect all objects to process
-        all_objects = []
+        all_keys = []
         for date_prefix in date_prefixes:
             objects = self.list_objects(bucket, date_prefix, start_time, end_time)
             for obj in objects:
                 if self._is_log_file(obj['Key']):
-                    all_objects.append(obj)
+                    all_keys.append(obj['Key'])
 
-        logger.info(f"Found {len(all_objects)} log files to process")
+        logger.info(f"Found {len(all_keys)} log files to process")
 
         # Process files in parallel
         all_log_entries = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit tasks
-            future_to_key = {
-                executor.submit(self.read_log_file, bucket, obj['Key']): obj['Key'] 
-                for obj in all_objects
-            }
-
-            # Collect results with progress bar
-            with tqdm(total=len(all_objects), desc="Processing S3 log files") as pbar:
-                for future in as_completed(future_to_key):
-                    key = future_to_key[future]
-                    try:
-                        log_entries = future.result()
-                        all_log_entries.extend(log_entries)
-                    except Exception as e:
-                        logger.error(f"Error processing {key}: {e}")
-                    finally:
-                        pbar.update(1)
+        with tqdm(total=len(all_keys), desc="Processing S3 log files") as pbar:
+            for _, log_entries in self.iter_log_files(bucket, all_keys, max_workers):
+                all_log_entries.extend(log_entries)
+                pbar.update(1)
 
         logger.info(f"Fetched {len(all_log_entries)} total log entries from S3")
         return all_log_entries
@@ -340,15 +378,20 @@ class S3Fetcher:
         return key.endswith('.gz') or key.endswith('.json')
 
     def fetch_logs_streaming(self, bucket: str, prefix: str, start_time: datetime,
-                            end_time: datetime) -> Iterator[Dict[str, Any]]:
+                            end_time: datetime,
+                            max_workers: int = DEFAULT_DOWNLOAD_WORKERS) -> Iterator[Dict[str, Any]]:
         """
         Fetch logs as a streaming iterator to reduce memory usage.
 
+        Objects are prefetched concurrently, so entries are yielded in file
+        completion order rather than key order.
+
         Args:
             bucket (str): S3 bucket name
             prefix (str): Base prefix for WAF logs
             start_time (datetime): Start of time range
             end_time (datetime): End of time range
+            max_workers (int): Maximum number of parallel download workers
 
         Yields:
             Dict[str, Any]: Individual log entries
@@ -357,18 +400,14 @@ class S3Fetcher:
 
         date_prefixes = self._generate_date_prefixes(prefix, start_time, end_time)
 
-        for date_prefix in date_prefixes:
-            objects = self.list_objects(bucket, date_prefix, start_time, end_time)
-
-            for obj in objects:
-                key = obj['Key']
-
-                if not self._is_log_file(key):
-                    continue
+        def iter_keys() -> Iterator[str]:
+            for date_prefix in date_prefixes:
+                for obj in self.list_objects(bucket, date_prefix, start_time, end_time):
+                    if self._is_log_file(obj['Key']):
+                        yield obj['Key']
 
-                log_entries = self.read_log_file(bucket, key)
-                for entry in log_entries:
-                    yield entry
+        for _, log_entries in self.iter_log_files(bucket, iter_keys(), max_workers):
+            yield from log_entries
 
     def get_bucket_info(self, bucket: str) -> Dict[str, Any]:
         """
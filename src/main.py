@@ -7,11 +7,13 @@ This tool fetches WAF data, stores it in DuckDB, and generates comprehensive
 Excel reports with visualizations.
 """
 
+import re
 import sys
 import logging
 import argparse
-import json
-from datetime import datetime
+from collections import namedtuple
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 try:
@@ -19,24 +21,18 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
     coloredlogs = None
 
-from storage.duckdb_manager import DuckDBManager
-from fetchers.cloudwatch_fetcher import CloudWatchFetcher
-from fetchers.s3_fetcher import S3Fetcher
+# Heavy modules (fetchers, metrics, reporters, LLM) are imported inside the
+# functions that use them so `--help` and skip-only runs start quickly.
+from storage.duckdb_manager import DuckDBManager, APPEND_BATCH_SIZE
 from processors.config_processor import WAFConfigProcessor
 from processors.log_parser import WAFLogParser
-from processors.metrics_calculator import MetricsCalculator
-from reporters.excel_generator import ExcelReportGenerator
-from reporters.prompt_exporter import PromptExporter
-from reporters.raw_logs_exporter import RawLogsExporter
-from reporters.raw_llm_exporter import RawLLMExporter
-from llm.analyzer import LLMAnalyzer
-from llm.prompt_injector import PromptInjector
-from llm.response_parser import ResponseParser
 from utils.aws_helpers import (
     verify_aws_credentials,
     get_session_info,
-    get_current_region
+    get_current_region,
+    determine_resource_type
 )
+from utils.json_helpers import dumps_json, loads_json, write_jsonl
 from utils.time_helpers import (
     get_time_window,
     format_datetime,
@@ -55,6 +51,17 @@ from utils.model_config import (
 # Global timezone configuration (default: UTC+7)
 TIMEZONE_OFFSET = '+07:00'  # Default timezone
 
+# Characters not allowed in raw-log export directory names
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w.-]')
+
+# CloudWatch Logs log group ARN, with or without the trailing ':*'
+_CLOUDWATCH_LOG_GROUP_ARN = re.compile(
+    r'^arn:[^:]+:logs:(?P<region>[^:]+):[^:]*:log-group:(?P<name>[^:]+)(?::\*)?$'
+)
+
+# CloudWatch log group destination resolved from a Web ACL logging configuration
+LogGroupRow = namedtuple('LogGroupRow', 'name web_acl_name web_acl_id region')
+
 # Setup logging
 logger = logging.getLogger(__name__)
 if coloredlogs:
@@ -183,10 +190,10 @@ def setup_directories(account_id: str = None, account_alias: str = None):
     created_paths = {}
     for key, directory in base_dirs.items():
         dir_path = Path(directory)
-        if not dir_path.exists():
-            dir_path.mkdir(parents=True, exist_ok=True)
+        try:
+            dir_path.mkdir(parents=True)
             logger.info(f"Created directory: {directory}/")
-        else:
+        except FileExistsError:
             logger.debug(f"Directory already exists: {directory}/")
         created_paths[key] = str(dir_path)
 
@@ -195,31 +202,50 @@ def setup_directories(account_id: str = None, account_alias: str = None):
 
 def export_raw_logs(raw_events: List[dict], raw_logs_dir: Optional[str], source: str,
                     identifier: str, start_time: Optional[datetime] = None,
-                    end_time: Optional[datetime] = None) -> Optional[Path]:
-    """Persist raw log events for offline inspection."""
+                    end_time: Optional[datetime] = None,
+                    file_format: str = 'jsonl') -> Optional[Path]:
+    """
+    Persist raw log events for offline inspection.
+
+    Args:
+        raw_events (List[dict]): Raw log events to export
+        raw_logs_dir (Optional[str]): Base directory for raw log exports
+        source (str): Log source name ('s3' or 'cloudwatch')
+        identifier (str): Source identifier used for the subdirectory name
+        start_time (Optional[datetime]): Start of the exported time window
+        end_time (Optional[datetime]): End of the exported time window
+        file_format (str): 'jsonl' or 'parquet' (zstd-compressed, falls back to JSON Lines on error)
+
+    Returns:
+        Optional[Path]: Path to the exported file, or None if nothing was written
+    """
     if not raw_logs_dir or not raw_events:
         return None
 
     try:
-        safe_identifier = identifier.strip('/').replace('/', '_')
-        safe_identifier = ''.join(ch if ch.isalnum() or ch in ('-', '_', '.') else '_' for ch in safe_identifier)
-        if not safe_identifier:
-            safe_identifier = 'default'
+        safe_identifier = _UNSAFE_FILENAME_CHARS.sub('_', identifier.strip('/').replace('/', '_')) or 'default'
         dest_dir = Path(raw_logs_dir) / source / safe_identifier
         dest_dir.mkdir(parents=True, exist_ok=True)
 
-        window_parts = []
-        if start_time:
-            window_parts.append(start_time.strftime('%Y%m%d%H%M%S'))
-        if end_time:
-            window_parts.append(end_time.strftime('%Y%m%d%H%M%S'))
-        window = '_to_'.join(window_parts) if window_parts else datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        if start_time and end_time:
+            window = f"{start_time:%Y%m%d%H%M%S}_to_{end_time:%Y%m%d%H%M%S}"
+        elif start_time or end_time:
+            window = f"{start_time or end_time:%Y%m%d%H%M%S}"
+        else:
+            window = f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
         file_path = dest_dir / f"{source}_logs_{window}.jsonl"
 
-        with open(file_path, 'w', encoding='utf-8') as fh:
-            for event in raw_events:
-                json.dump(event, fh, default=str)
-                fh.write('\n')
+        if file_format == 'parquet':
+            parquet_path = file_path.with_suffix('.parquet')
+            try:
+                write_parquet(raw_events, parquet_path)
+                logger.info(f"Exported raw {source} logs to {parquet_path}")
+                return parquet_path
+            except Exception as exc:
+                parquet_path.unlink(missing_ok=True)
+                logger.warning(f"Parquet export failed, writing JSON Lines instead: {exc}")
+
+        write_jsonl(file_path, raw_events)
 
         logger.info(f"Exported raw {source} logs to {file_path}")
         return file_path
@@ -228,6 +254,65 @@ def export_raw_logs(raw_events: List[dict], raw_logs_dir: Optional[str], source:
         return None
 
 
+def write_parquet(records: List[dict], parquet_path: Path, row_group_size: int = 200000) -> None:
+    """
+    Write records to a zstd-compressed Parquet file using DuckDB.
+
+    Records are loaded into DuckDB as JSON and copied straight to Parquet, with
+    no intermediate file. The schema is inferred from every record, so nested
+    WAF log fields become typed STRUCT/LIST columns that can be re-read with
+    read_parquet().
+
+    Args:
+        records (List[dict]): JSON-serializable records
+        parquet_path (Path): Destination Parquet file
+        row_group_size (int): Rows per Parquet row group
+    """
+    import duckdb
+    import pandas as pd
+
+    target = str(parquet_path).replace("'", "''")
+    events = pd.DataFrame({'event': [dumps_json(record) for record in records]})
+
+    conn = duckdb.connect()
+    try:
+        conn.register('raw_events_df', events)
+        conn.execute("CREATE TEMP TABLE raw_events AS SELECT event::JSON AS event FROM raw_events_df")
+        conn.unregister('raw_events_df')
+        del events
+
+        structure = conn.execute("SELECT json_group_structure(event) FROM raw_events").fetchone()[0]
+        structure = dumps_json(_parquet_json_structure(loads_json(structure))).replace("'", "''")
+
+        conn.execute(f"""
+            COPY (
+                SELECT record.* FROM (SELECT json_transform(event, '{structure}') AS record FROM raw_events)
+            ) TO '{target}' (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {int(row_group_size)})
+        """)
+    finally:
+        conn.close()
+
+
+def _parquet_json_structure(structure: Any) -> Any:
+    """
+    Map an inferred JSON structure to the column types used for Parquet exports.
+
+    Fields that were null in every record stay raw JSON, and unsigned integers
+    become BIGINT, matching DuckDB's read_json_auto() type detection.
+
+    Args:
+        structure (Any): Structure from DuckDB's json_group_structure()
+
+    Returns:
+        Any: Structure for json_transform()
+    """
+    if isinstance(structure, dict):
+        return {key: _parquet_json_structure(value) for key, value in structure.items()}
+    if isinstance(structure, list):
+        return [_parquet_json_structure(value) for value in structure]
+    return {'NULL': 'JSON', 'UBIGINT': 'BIGINT'}.get(structure, structure)
+
+
 def print_banner():
     """Print application banner."""
     banner = """
@@ -273,11 +358,34 @@ def display_web_acl_summary(db_manager: DuckDBManager):
     """
     conn = db_manager.get_connection()
 
-    # Get Web ACLs
+    # Get Web ACLs with rule counts, resources and logging status in one query
     web_acls = conn.execute("""
-        SELECT web_acl_id, name, scope, default_action, capacity
-        FROM web_acls
-        ORDER BY scope, name
+        SELECT
+            wa.web_acl_id,
+            wa.name,
+            wa.scope,
+            wa.default_action,
+            wa.capacity,
+            COALESCE(r.rule_count, 0) AS rule_count,
+            COALESCE(ra.resources, []) AS resources,
+            lc.destination_type
+        FROM web_acls wa
+        LEFT JOIN (
+            SELECT web_acl_id, COUNT(*) AS rule_count
+            FROM rules
+            GROUP BY web_acl_id
+        ) r ON r.web_acl_id = wa.web_acl_id
+        LEFT JOIN (
+            SELECT web_acl_id, list([resource_arn, resource_type]) AS resources
+            FROM resource_associations
+            GROUP BY web_acl_id
+        ) ra ON ra.web_acl_id = wa.web_acl_id
+        LEFT JOIN (
+            SELECT web_acl_id, any_value(destination_type) AS destination_type
+            FROM logging_configurations
+            GROUP BY web_acl_id
+        ) lc ON lc.web_acl_id = wa.web_acl_id
+        ORDER BY wa.scope, wa.name
     """).fetchall()
 
     if not web_acls:
@@ -288,24 +396,14 @@ def display_web_acl_summary(db_manager: DuckDBManager):
     print("📋 Web ACL Inventory")
     print("="*80)
 
-    for idx, (acl_id, name, scope, default_action, capacity) in enumerate(web_acls, 1):
+    for idx, (acl_id, name, scope, default_action, capacity,
+              rule_count, resources, logging_destination) in enumerate(web_acls, 1):
         print(f"\n{idx}. {name}")
         print(f"   Scope: {scope}")
         print(f"   Default Action: {default_action}")
         print(f"   Capacity: {capacity} WCU")
-
-        # Get rule count
-        rule_count = conn.execute("""
-            SELECT COUNT(*) FROM rules WHERE web_acl_id = ?
-        """, [acl_id]).fetchone()[0]
         print(f"   Rules: {rule_count}")
 
-        # Get protected resources
-        resources = conn.execute("""
-            SELECT resource_arn, resource_type FROM resource_associations
-            WHERE web_acl_id = ?
-        """, [acl_id]).fetchall()
-
         if resources:
             print(f"   Protected Resources: {len(resources)}")
             for resource_arn, resource_type in resources[:3]:  # Show first 3
@@ -318,19 +416,37 @@ def display_web_acl_summary(db_manager: DuckDBManager):
             print(f"   Protected Resources: None")
 
         # Check logging status
-        logging_config = conn.execute("""
-            SELECT destination_type FROM logging_configurations
-            WHERE web_acl_id = ?
-        """, [acl_id]).fetchone()
-
-        if logging_config:
-            print(f"   Logging: ✓ Enabled ({logging_config[0]})")
+        if logging_destination:
+            print(f"   Logging: ✓ Enabled ({logging_destination})")
         else:
             print(f"   Logging: ✗ Not configured")
 
     print("\n" + "="*80)
 
 
+def prompt_menu_number(prompt: str, max_value: int) -> int:
+    """
+    Prompt until the user enters a whole number between 1 and max_value.
+
+    Args:
+        prompt (str): Input prompt text
+        max_value (int): Largest accepted number
+
+    Returns:
+        int: The selected number
+    """
+    while True:
+        choice_input = input(prompt).strip()
+        if not choice_input.isdecimal():
+            print("❌ Please enter a valid number")
+            continue
+
+        selection = int(choice_input)
+        if 1 <= selection <= max_value:
+            return selection
+        print(f"❌ Please enter a number between 1 and {max_value}")
+
+
 def select_web_acls(db_manager: DuckDBManager):
     """
     Let user select which Web ACLs to analyze.
@@ -341,20 +457,14 @@ def select_web_acls(db_manager: DuckDBManager):
     Returns:
         list: List of selected Web ACL IDs, or None for all
     """
-    conn = db_manager.get_connection()
-
-    web_acls = conn.execute("""
-        SELECT web_acl_id, name, scope FROM web_acls
-        ORDER BY scope, name
-    """).fetchall()
+    web_acls = db_manager.list_web_acls(order_by='scope')
 
     if not web_acls:
         return None
 
     print("\n📊 Select Web ACLs to analyze:")
     print("0. Analyze ALL Web ACLs")
-    for idx, (acl_id, name, scope) in enumerate(web_acls, 1):
-        print(f"{idx}. {name} ({scope})")
+    print("\n".join(f"{idx}. {name} ({scope})" for idx, (_, name, scope) in enumerate(web_acls, 1)))
 
     while True:
         selection = input("\nEnter selection (0 for all, or comma-separated numbers): ").strip()
@@ -395,30 +505,39 @@ def fetch_waf_configurations(db_manager: DuckDBManager, scope: str = 'REGIONAL',
 
     logger.info(f"Found {len(web_acl_configs)} Web ACLs")
 
-    # Store each Web ACL with its resources and logging config
+    # Collect rules, resources and logging config for each Web ACL before writing
+    fetched_configs = []
     for web_acl_config in web_acl_configs:
-        # Store Web ACL
-        db_manager.insert_web_acl(web_acl_config)
-
-        web_acl_id = web_acl_config.get('Id')
-        web_acl_arn = web_acl_config.get('ARN')
-
-        # Extract and store rules
-        rules = processor.extract_rules_from_web_acl(web_acl_config)
-        if rules:
-            db_manager.insert_rules(web_acl_id, rules)
-
-        # Get and store resource associations
-        resources = processor.get_resources_for_web_acl(web_acl_arn)
-        for resource_arn in resources:
-            from utils.aws_helpers import determine_resource_type
-            resource_type = determine_resource_type(resource_arn)
-            db_manager.insert_resource_association(web_acl_id, resource_arn, resource_type)
+        resources, logging_config = processor.get_resources_and_logging(web_acl_config.get('ARN'))
+        fetched_configs.append((
+            web_acl_config,
+            processor.extract_rules_from_web_acl(web_acl_config),
+            resources,
+            logging_config
+        ))
+
+    # Store everything in one transaction
+    with db_manager.transaction():
+        # Store Web ACLs
+        db_manager.insert_web_acls(web_acl_configs)
+        logger.info(f"Stored {len(web_acl_configs)} Web ACLs")
+
+        for web_acl_config, rules, resources, logging_config in fetched_configs:
+            web_acl_id = web_acl_config.get('Id')
+
+            # Store rules
+            if rules:
+                db_manager.insert_rules(web_acl_id, rules)
+
+            # Store resource associations
+            db_manager.insert_resource_associations(
+                web_acl_id,
+                [(resource_arn, determine_resource_type(resource_arn)) for resource_arn in resources]
+            )
 
-        # Get and store logging configuration
-        logging_config = processor.get_logging_configuration(web_acl_arn)
-        if logging_config:
-            db_manager.insert_logging_configuration(web_acl_id, logging_config)
+            # Store logging configuration
+            if logging_config:
+                db_manager.insert_logging_configuration(web_acl_id, logging_config)
 
     logger.info("WAF configurations stored successfully")
 
@@ -432,7 +551,8 @@ def fetch_waf_configurations(db_manager: DuckDBManager, scope: str = 'REGIONAL',
 def fetch_logs_from_cloudwatch(db_manager: DuckDBManager, log_group_name: str,
                                start_time: datetime, end_time: datetime,
                                raw_logs_dir: Optional[str] = None,
-                               region: Optional[str] = None):
+                               region: Optional[str] = None,
+                               cluster_logs: bool = False):
     """
     Fetch logs from CloudWatch and store in database.
     Also exports raw logs to JSON Lines format.
@@ -444,7 +564,11 @@ def fetch_logs_from_cloudwatch(db_manager: DuckDBManager, log_group_name: str,
         end_time (datetime): End of time range
         raw_logs_dir (Optional[str]): Directory for raw logs export
         region (Optional[str]): AWS region for CloudWatch (uses current region if not specified)
+        cluster_logs (bool): Rewrite waf_logs in clustered order after storing the logs
     """
+    from fetchers.cloudwatch_fetcher import CloudWatchFetcher
+    from reporters.raw_logs_exporter import RawLogsExporter
+
     logger.info(f"Fetching logs from CloudWatch: {log_group_name}")
     logger.info(f"Time range: {get_time_window_description(start_time, end_time)}")
     if region:
@@ -453,57 +577,72 @@ def fetch_logs_from_cloudwatch(db_manager: DuckDBManager, log_group_name: str,
     fetcher = CloudWatchFetcher(region=region)
     parser = WAFLogParser()
 
-    # Fetch logs
-    log_events = fetcher.get_log_events(log_group_name, start_time, end_time)
+    # Export to raw-logs directory (use provided path or default)
+    if raw_logs_dir:
+        output_dir = raw_logs_dir
+    else:
+        output_dir = f"raw-logs"
 
-    if not log_events:
-        logger.warning("No log events found in CloudWatch")
-        return
+    # Stream pages through raw export, parsing and insertion so only one
+    # insert batch is held in memory regardless of the time window
+    raw_writer = None
+    try:
+        logger.info("📦 Exporting raw CloudWatch logs...")
+        raw_writer = RawLogsExporter().open_web_acl_stream(output_dir, log_source_name=log_group_name)
+    except Exception as e:
+        logger.warning(f"Failed to export raw logs (continuing with processing): {e}")
 
-    logger.info(f"Fetched {len(log_events)} log events")
+    total_events = 0
+    stored_count = 0
+    pending = []
 
-    # Export raw logs immediately after fetching
     try:
-        session_info = get_session_info()
-        account_id = session_info.get('account_id')
-        account_alias = session_info.get('account_alias')
-        account_identifier = get_account_identifier(account_id, account_alias)
-
-        # Export to raw-logs directory (use provided path or default)
-        if raw_logs_dir:
-            output_dir = raw_logs_dir
-        else:
-            output_dir = f"raw-logs"
+        for page in fetcher.iter_log_events(log_group_name, start_time, end_time):
+            total_events += len(page)
 
-        logger.info("📦 Exporting raw CloudWatch logs...")
-        exporter = RawLogsExporter()
-        exported_file = exporter.export_raw_logs_by_web_acl(
-            log_events,
-            output_dir,
-            log_source_name=log_group_name
-        )
+            if raw_writer is not None:
+                try:
+                    raw_writer.write(page)
+                except Exception as e:
+                    logger.warning(f"Failed to export raw logs (continuing with processing): {e}")
+                    raw_writer.close()
+                    raw_writer = None
+
+            pending.extend(parser.parse_stream(page, source='cloudwatch'))
+            if len(pending) >= APPEND_BATCH_SIZE:
+                stored_count += db_manager.insert_log_entries(pending)
+                pending = []
+
+        if pending:
+            stored_count += db_manager.insert_log_entries(pending)
+    finally:
+        if raw_writer is not None:
+            raw_writer.close()
 
-        if exported_file:
-            logger.info(f"✅ Raw logs exported successfully")
-    except Exception as e:
-        logger.warning(f"Failed to export raw logs (continuing with processing): {e}")
+    if not total_events:
+        logger.warning("No log events found in CloudWatch")
+        return
 
-    # Parse logs
-    parsed_logs = parser.parse_batch(log_events, source='cloudwatch')
+    logger.info(f"Fetched {total_events} log events")
+    if raw_writer is not None and raw_writer.exported_files:
+        logger.info(f"✅ Raw logs exported successfully")
 
-    if not parsed_logs:
+    if not stored_count:
         logger.warning("No logs were successfully parsed")
         return
 
-    # Store in database
-    db_manager.insert_log_entries(parsed_logs)
+    if cluster_logs:
+        db_manager.cluster_waf_logs()
+    db_manager.build_summary_tables()
 
-    logger.info(f"Successfully stored {len(parsed_logs)} log entries")
+    logger.info(f"Successfully stored {stored_count} log entries")
 
 
 def fetch_logs_from_s3(db_manager: DuckDBManager, bucket: str, prefix: str,
                       start_time: datetime, end_time: datetime,
-                      raw_logs_dir: Optional[str] = None):
+                      raw_logs_dir: Optional[str] = None,
+                      raw_logs_format: str = 'jsonl',
+                      cluster_logs: bool = False):
     """
     Fetch logs from S3 and store in database.
 
@@ -513,7 +652,12 @@ def fetch_logs_from_s3(db_manager: DuckDBManager, bucket: str, prefix: str,
         prefix (str): S3 key prefix
         start_time (datetime): Start of time range
         end_time (datetime): End of time range
+        raw_logs_dir (Optional[str]): Directory for raw logs export
+        raw_logs_format (str): Raw logs export format ('jsonl' or 'parquet')
+        cluster_logs (bool): Rewrite waf_logs in clustered order after storing the logs
     """
+    from fetchers.s3_fetcher import S3Fetcher
+
     logger.info(f"Fetching logs from S3: s3://{bucket}/{prefix}")
     logger.info(f"Time range: {get_time_window_description(start_time, end_time)}")
 
@@ -539,27 +683,111 @@ def fetch_logs_from_s3(db_manager: DuckDBManager, bucket: str, prefix: str,
         source='s3',
         identifier=f"{bucket}/{prefix}",
         start_time=start_time,
-        end_time=end_time
+        end_time=end_time,
+        file_format=raw_logs_format
     )
 
-    # Parse logs
-    parsed_logs = parser.parse_batch(log_entries, source='s3')
+    # Parse and store in APPEND_BATCH_SIZE chunks so only one chunk of
+    # normalized entries is held in memory at a time
+    logger.info(f"Parsing {len(log_entries)} log entries from s3")
+    parsed_stream = parser.parse_stream(log_entries, source='s3')
+    stored_count = 0
 
-    if not parsed_logs:
+    while True:
+        parsed_chunk = list(islice(parsed_stream, APPEND_BATCH_SIZE))
+        if not parsed_chunk:
+            break
+        stored_count += db_manager.insert_log_entries(parsed_chunk)
+
+    if not stored_count:
         logger.warning("No logs were successfully parsed")
         return
 
-    # Store in database (in chunks for large datasets)
-    chunk_size = 10000
-    for i in range(0, len(parsed_logs), chunk_size):
-        chunk = parsed_logs[i:i+chunk_size]
-        db_manager.insert_log_entries(chunk)
-        logger.info(f"Stored chunk {i//chunk_size + 1}: {len(chunk)} entries")
+    if cluster_logs:
+        db_manager.cluster_waf_logs()
+    db_manager.build_summary_tables()
+
+    logger.info(f"Successfully parsed {stored_count} entries, {len(log_entries) - stored_count} errors")
+    logger.info(f"Successfully stored {stored_count} log entries")
+
+
+def get_metrics_cache_dir(db_manager: DuckDBManager) -> Optional[str]:
+    """
+    Get the directory where computed metrics are cached for a database.
+
+    Args:
+        db_manager (DuckDBManager): Database manager instance
+
+    Returns:
+        Optional[str]: Cache directory next to the database file, or None for
+            in-memory databases (no metrics caching)
+    """
+    from processors.metrics_calculator import METRICS_CACHE_DIRNAME
+
+    if str(db_manager.db_path).startswith(':memory:'):
+        return None
+
+    return str(Path(db_manager.db_path).parent / METRICS_CACHE_DIRNAME)
+
+
+def load_report_inventory(db_manager: DuckDBManager, selected_web_acl_ids: Optional[List[str]] = None):
+    """
+    Load Web ACL inventory tables for report generation.
+
+    Rows are fetched straight from DuckDB into dictionaries keyed by the live
+    column names; the sheet writers iterate records, so no DataFrame is built.
+
+    Args:
+        db_manager (DuckDBManager): Database manager instance
+        selected_web_acl_ids (Optional[List[str]]): Web ACL IDs to include. If None, includes all.
+
+    Returns:
+        Tuple: (web_acls, resources, logging_configs, rules_by_web_acl)
+    """
+    conn = db_manager.get_connection()
+
+    if selected_web_acl_ids:
+        # Bind the selected IDs once into a temp table; each inventory query semi-joins it
+        conn.execute(
+            "CREATE OR REPLACE TEMP TABLE report_selected_web_acls AS "
+            "SELECT UNNEST(?::VARCHAR[]) AS web_acl_id",
+            [list(selected_web_acl_ids)]
+        )
+
+    def fetch_scoped(table_name):
+        if selected_web_acl_ids:
+            result = conn.execute(
+                f"SELECT t.* FROM {table_name} t SEMI JOIN report_selected_web_acls USING (web_acl_id)"
+            )
+        else:
+            result = conn.execute(f"SELECT * FROM {table_name}")
+        columns = [col[0] for col in result.description]
+        return [dict(zip(columns, row)) for row in result.fetchall()]
+
+    try:
+        web_acls = fetch_scoped('web_acls')
+        resources = fetch_scoped('resource_associations')
+        logging_configs = fetch_scoped('logging_configurations')
+        rules = fetch_scoped('rules')
+    finally:
+        if selected_web_acl_ids:
+            conn.execute("DROP TABLE IF EXISTS report_selected_web_acls")
+
+    # Get Web ACL names for resources
+    web_acl_names = {acl['web_acl_id']: acl['name'] for acl in web_acls}
+    for resource in resources:
+        resource['web_acl_name'] = web_acl_names.get(resource['web_acl_id']) or 'Unknown'
+
+    # Group rules by Web ACL
+    rules_by_web_acl = {}
+    for rule in rules:
+        rules_by_web_acl.setdefault(rule['web_acl_id'], []).append(rule)
 
-    logger.info(f"Successfully stored {len(parsed_logs)} log entries")
+    return web_acls, resources, logging_configs, rules_by_web_acl
 
 
-def generate_excel_report(db_manager: DuckDBManager, output_path: str, selected_web_acl_ids: Optional[List[str]] = None, account_info: Optional[Dict[str, Any]] = None):
+def generate_excel_report(db_manager: DuckDBManager, output_path: str, selected_web_acl_ids: Optional[List[str]] = None, account_info: Optional[Dict[str, Any]] = None,
+                          approximate_unique_ips: bool = False):
     """
     Generate Excel report with visualizations.
 
@@ -568,59 +796,27 @@ def generate_excel_report(db_manager: DuckDBManager, output_path: str, selected_
         output_path (str): Path to save Excel report
         selected_web_acl_ids (Optional[List[str]]): List of Web ACL IDs to include in report. If None, includes all.
         account_info (Optional[Dict[str, Any]]): AWS account information (account_id, account_alias, region, profile)
+        approximate_unique_ips (bool): Estimate the total unique client IP count (roughly 10-20% error) instead of counting it exactly
     """
+    from processors.metrics_calculator import MetricsCalculator
+    from reporters.excel_generator import ExcelReportGenerator
+    from reporters.prompt_exporter import PromptExporter
+
     if selected_web_acl_ids:
         logger.info(f"Generating Excel report for {len(selected_web_acl_ids)} Web ACL(s)...")
     else:
         logger.info("Generating Excel report for all Web ACLs...")
 
     # Calculate metrics with Web ACL filter
-    calculator = MetricsCalculator(db_manager, web_acl_ids=selected_web_acl_ids)
+    calculator = MetricsCalculator(db_manager, web_acl_ids=selected_web_acl_ids,
+                                   cache_dir=get_metrics_cache_dir(db_manager),
+                                   approximate_unique_ips=approximate_unique_ips)
     metrics = calculator.calculate_all_metrics()
 
     # Get Web ACL data
-    conn = db_manager.get_connection()
-
-    # Filter Web ACLs if specific ones selected
-    if selected_web_acl_ids:
-        # Escape single quotes in IDs
-        escaped_ids = [id.replace("'", "''") for id in selected_web_acl_ids]
-        ids_str = "', '".join(escaped_ids)
-        web_acl_filter = f"WHERE web_acl_id IN ('{ids_str}')"
-    else:
-        web_acl_filter = ""
-
-    web_acls = conn.execute(f"SELECT * FROM web_acls {web_acl_filter}").fetchall()
-    web_acls_list = [dict(zip(['web_acl_id', 'name', 'scope', 'default_action', 'description',
-                               'visibility_config', 'capacity', 'managed_by_firewall_manager',
-                               'created_at', 'updated_at'], row)) for row in web_acls]
-
-    resources = conn.execute(f"SELECT * FROM resource_associations {web_acl_filter}").fetchall()
-    resources_list = [dict(zip(['association_id', 'web_acl_id', 'resource_arn',
-                                'resource_type', 'created_at'], row)) for row in resources]
-
-    # Get Web ACL names for resources
-    web_acl_names = {acl['web_acl_id']: acl['name'] for acl in web_acls_list}
-    for resource in resources_list:
-        resource['web_acl_name'] = web_acl_names.get(resource['web_acl_id'], 'Unknown')
-
-    logging_configs = conn.execute(f"SELECT * FROM logging_configurations {web_acl_filter}").fetchall()
-    logging_configs_list = [dict(zip(['config_id', 'web_acl_id', 'destination_type',
-                                     'destination_arn', 'log_format', 'sampling_rate',
-                                     'redacted_fields', 'created_at'], row)) for row in logging_configs]
-
-    # Get rules
-    rules = conn.execute(f"SELECT * FROM rules {web_acl_filter}").fetchall()
-    rules_list = [dict(zip(['rule_id', 'web_acl_id', 'name', 'priority', 'rule_type', 'action',
-                            'statement', 'visibility_config', 'override_action', 'created_at', 'updated_at'], row)) for row in rules]
-
-    # Group rules by Web ACL
-    rules_by_web_acl = {}
-    for rule in rules_list:
-        web_acl_id = rule.get('web_acl_id')
-        if web_acl_id not in rules_by_web_acl:
-            rules_by_web_acl[web_acl_id] = []
-        rules_by_web_acl[web_acl_id].append(rule)
+    web_acls_list, resources_list, logging_configs_list, rules_by_web_acl = load_report_inventory(
+        db_manager, selected_web_acl_ids
+    )
 
     # Generate Excel report
     generator = ExcelReportGenerator(output_path)
@@ -631,11 +827,12 @@ def generate_excel_report(db_manager: DuckDBManager, output_path: str, selected_
     # Export LLM prompts with injected data
     try:
         # Determine export directory based on account (fallbacks to 'default' offline)
-        session_info = {}
-        try:
-            session_info = get_session_info()
-        except Exception as session_error:
-            logger.warning(f"Could not retrieve AWS session info for prompt export: {session_error}")
+        session_info = account_info or {}
+        if not session_info:
+            try:
+                session_info = get_session_info()
+            except Exception as session_error:
+                logger.warning(f"Could not retrieve AWS session info for prompt export: {session_error}")
 
         account_id = session_info.get('account_id') if session_info else None
         account_alias = session_info.get('account_alias') if session_info else None
@@ -652,7 +849,8 @@ def generate_excel_report(db_manager: DuckDBManager, output_path: str, selected_
         logger.warning(f"Failed to export prompts: {e}")
 
 
-def generate_llm_analysis(db_manager: DuckDBManager, session_info: Dict[str, Any], dir_paths: Dict[str, str], account_identifier: str) -> Optional[Dict[str, Any]]:
+def generate_llm_analysis(db_manager: DuckDBManager, session_info: Dict[str, Any], dir_paths: Dict[str, str], account_identifier: str,
+                          approximate_unique_ips: bool = False) -> Optional[Dict[str, Any]]:
     """
     Generate LLM-powered security analysis and create updated Excel report.
 
@@ -661,17 +859,22 @@ def generate_llm_analysis(db_manager: DuckDBManager, session_info: Dict[str, Any
         session_info: AWS session information
         dir_paths: Dictionary of account-specific directory paths
         account_identifier: Account identifier for naming
+        approximate_unique_ips: Estimate the total unique client IP count (roughly 10-20% error) instead of counting it exactly
 
     Returns:
         Optional[Dict[str, Any]]: LLM analysis results or None if failed
     """
+    from processors.metrics_calculator import MetricsCalculator
+    from reporters.excel_generator import ExcelReportGenerator
+    from reporters.raw_llm_exporter import RawLLMExporter
+    from llm.analyzer import LLMAnalyzer
+
     print("\n" + "="*80)
     print("🤖 LLM Security Analysis")
     print("="*80)
 
     # Check if we have data
-    stats = db_manager.get_database_stats()
-    if stats.get('web_acls', 0) == 0:
+    if not db_manager.has_web_acls():
         print("\n⚠️  No data found in database.")
         print("Please fetch WAF configurations and logs first (Options 1 & 2)")
         return None
@@ -765,8 +968,7 @@ def generate_llm_analysis(db_manager: DuckDBManager, session_info: Dict[str, Any
     profile = profile_input if profile_input else None
 
     # Select Web ACL
-    conn = db_manager.get_connection()
-    web_acls = conn.execute("SELECT web_acl_id, name, scope FROM web_acls ORDER BY name").fetchall()
+    web_acls = db_manager.list_web_acls()
 
     if not web_acls:
         print("\n⚠️  No Web ACLs found in database.")
@@ -774,21 +976,12 @@ def generate_llm_analysis(db_manager: DuckDBManager, session_info: Dict[str, Any
 
     print("\n📋 Select Web ACL to analyze:")
     print("="*80)
-    for idx, (web_acl_id, name, scope) in enumerate(web_acls, 1):
-        print(f"{idx}. {name} (Scope: {scope})")
-    print(f"{len(web_acls) + 1}. All Web ACLs")
+    lines = [f"{idx}. {name} (Scope: {scope})" for idx, (_, name, scope) in enumerate(web_acls, 1)]
+    lines.append(f"{len(web_acls) + 1}. All Web ACLs")
+    print("\n".join(lines))
     print("="*80)
 
-    while True:
-        choice_input = input(f"\nSelect Web ACL (1-{len(web_acls) + 1}): ").strip()
-        try:
-            selection = int(choice_input)
-            if 1 <= selection <= len(web_acls) + 1:
-                break
-            else:
-                print(f"❌ Please enter a number between 1 and {len(web_acls) + 1}")
-        except ValueError:
-            print("❌ Please enter a valid number")
+    selection = prompt_menu_number(f"\nSelect Web ACL (1-{len(web_acls) + 1}): ", len(web_acls) + 1)
 
     # Determine which Web ACL(s) to analyze
     if selection == len(web_acls) + 1:
@@ -803,10 +996,13 @@ def generate_llm_analysis(db_manager: DuckDBManager, session_info: Dict[str, Any
     try:
         # Calculate metrics
         print("\n📊 Calculating metrics...")
-        calculator = MetricsCalculator(db_manager, web_acl_ids=selected_web_acl_ids)
+        calculator = MetricsCalculator(db_manager, web_acl_ids=selected_web_acl_ids,
+                                       cache_dir=get_metrics_cache_dir(db_manager),
+                                       approximate_unique_ips=approximate_unique_ips)
         metrics = calculator.calculate_all_metrics()
 
         # Get Web ACL and resource data
+        conn = db_manager.get_connection()
         if selected_web_acl_ids:
             web_acls_data = conn.execute(
                 "SELECT * FROM web_acls WHERE web_acl_id = ?",
@@ -964,28 +1160,9 @@ def generate_llm_analysis(db_manager: DuckDBManager, session_info: Dict[str, Any
         output_path = f"{output_dir}/{account_identifier}_{timestamp}_waf_report_with_llm.xlsx"
 
         # Get all the data needed for Excel report
-        conn = db_manager.get_connection()
-
-        # Filter based on selection
-        if selected_web_acl_ids:
-            escaped_ids = [id.replace("'", "''") for id in selected_web_acl_ids]
-            ids_str = "', '".join(escaped_ids)
-            web_acl_filter = f"WHERE web_acl_id IN ('{ids_str}')"
-        else:
-            web_acl_filter = ""
-
-        web_acls_list = conn.execute(f"SELECT * FROM web_acls {web_acl_filter}").fetchdf().to_dict('records')
-        resources_list = conn.execute(f"SELECT * FROM resource_associations {web_acl_filter}").fetchdf().to_dict('records')
-        logging_configs_list = conn.execute(f"SELECT * FROM logging_configurations {web_acl_filter}").fetchdf().to_dict('records')
-        rules_list = conn.execute(f"SELECT * FROM rules {web_acl_filter}").fetchdf().to_dict('records')
-
-        # Group rules by Web ACL
-        rules_by_web_acl = {}
-        for rule in rules_list:
-            web_acl_id = rule.get('web_acl_id')
-            if web_acl_id not in rules_by_web_acl:
-                rules_by_web_acl[web_acl_id] = []
-            rules_by_web_acl[web_acl_id].append(rule)
+        web_acls_list, resources_list, logging_configs_list, rules_by_web_acl = load_report_inventory(
+            db_manager, selected_web_acl_ids
+        )
 
         # Create report with LLM analysis
         generator = ExcelReportGenerator(output_path)
@@ -1110,7 +1287,7 @@ def get_cloudwatch_log_groups_from_db(db_manager: DuckDBManager):
         db_manager (DuckDBManager): Database manager instance
 
     Returns:
-        list: List of tuples (log_group_name, web_acl_name, web_acl_id, region)
+        List[LogGroupRow]: Log groups as (name, web_acl_name, web_acl_id, region) rows
     """
     conn = db_manager.get_connection()
 
@@ -1131,20 +1308,11 @@ def get_cloudwatch_log_groups_from_db(db_manager: DuckDBManager):
         # Parse CloudWatch log group ARN
         # Format: arn:aws:logs:region:account-id:log-group:log-group-name:*
         # or: arn:aws:logs:region:account-id:log-group:log-group-name
-        try:
-            # Extract region and log group name from ARN
-            # ARN format: arn:partition:service:region:account:resource
-            arn_parts = dest_arn.split(':')
-            if len(arn_parts) >= 6 and ':log-group:' in dest_arn:
-                region = arn_parts[3]  # Region is at index 3
-                log_group_part = dest_arn.split(':log-group:')[1]
-                # Remove trailing ':*' if present
-                log_group_name = log_group_part.rstrip(':*')
-                log_groups.append((log_group_name, web_acl_name, web_acl_id, region))
-            else:
-                logger.warning(f"Could not parse log group from ARN: {dest_arn}")
-        except Exception as e:
-            logger.error(f"Error parsing CloudWatch ARN {dest_arn}: {e}")
+        match = _CLOUDWATCH_LOG_GROUP_ARN.match(dest_arn or '')
+        if match:
+            log_groups.append(LogGroupRow(match['name'], web_acl_name, web_acl_id, match['region']))
+        else:
+            logger.warning(f"Could not parse log group from ARN: {dest_arn}")
 
     return log_groups
 
@@ -1249,6 +1417,13 @@ def main():
     parser.add_argument('--output', help='Output Excel report filename (default: output/{account_identifier}/{account_identifier}_{timestamp}_waf_report.xlsx)')
     parser.add_argument('--non-interactive', action='store_true',
                        help='Run in non-interactive mode (no prompts)')
+    parser.add_argument('--raw-logs-format', choices=['jsonl', 'parquet'], default='jsonl',
+                       help='Format for raw S3 log exports (default: jsonl; parquet uses zstd compression)')
+    parser.add_argument('--approximate-unique-ips', action='store_true',
+                       help='Estimate the total unique client IP count with HyperLogLog (faster on large logs, '
+                       'but typically 10-20%% off; marked as estimated in the report)')
+    parser.add_argument('--cluster-logs', action='store_true',
+                       help='Re-sort stored logs by action and time after fetching (one-off; speeds up later reports on large databases)')
 
     args = parser.parse_args()
 
@@ -1308,8 +1483,7 @@ def main():
                 elif choice == '2':
                     # Fetch WAF Logs
                     # First check if we have any Web ACLs
-                    stats = db_manager.get_database_stats()
-                    if stats.get('web_acls', 0) == 0:
+                    if not db_manager.has_web_acls():
                         print("\n⚠️  No Web ACLs found in database.")
                         print("Please fetch WAF configurations first (Option 1)")
                         continue
@@ -1332,10 +1506,10 @@ def main():
 
                         if db_log_groups:
                             print("\n📋 CloudWatch log groups from Web ACL configurations:")
-                            for idx, (lg_name, web_acl_name, web_acl_id, region) in enumerate(db_log_groups, 1):
-                                print(f"{idx}. {lg_name}")
-                                print(f"    Web ACL: {web_acl_name}")
-                                print(f"    Region: {region}")
+                            print("\n".join(
+                                f"{idx}. {lg.name}\n    Web ACL: {lg.web_acl_name}\n    Region: {lg.region}"
+                                for idx, lg in enumerate(db_log_groups, 1)
+                            ))
 
                             print(f"{len(db_log_groups) + 1}. Enter a different log group name")
 
@@ -1343,8 +1517,8 @@ def main():
                             try:
                                 idx = int(selection) - 1
                                 if 0 <= idx < len(db_log_groups):
-                                    log_group_name = db_log_groups[idx][0]
-                                    log_group_region = db_log_groups[idx][3]
+                                    log_group_name = db_log_groups[idx].name
+                                    log_group_region = db_log_groups[idx].region
                                 else:
                                     # Manual entry
                                     log_group_name = input("Enter CloudWatch log group name: ")
@@ -1358,13 +1532,13 @@ def main():
                             print("\n💡 No CloudWatch log groups found in database configurations.")
                             print("Querying CloudWatch API for available log groups...")
 
+                            from fetchers.cloudwatch_fetcher import CloudWatchFetcher
                             fetcher = CloudWatchFetcher()
-                            api_log_groups = fetcher.list_log_groups(prefix='aws-waf-logs')
+                            api_log_groups = fetcher.list_log_groups()
 
                             if api_log_groups:
                                 print("\n📋 Available WAF log groups from CloudWatch:")
-                                for idx, lg in enumerate(api_log_groups, 1):
-                                    print(f"{idx}. {lg['logGroupName']}")
+                                print("\n".join(f"{idx}. {lg['logGroupName']}" for idx, lg in enumerate(api_log_groups, 1)))
 
                                 selection = input("\nEnter log group number or full name: ").strip()
                                 try:
@@ -1383,7 +1557,8 @@ def main():
                             start_time,
                             end_time,
                             raw_logs_dir='raw-logs',
-                            region=log_group_region
+                            region=log_group_region,
+                            cluster_logs=args.cluster_logs
                         )
 
                     elif log_choice == '2':
@@ -1391,7 +1566,8 @@ def main():
                         bucket = input("\nEnter S3 bucket name: ")
                         prefix = input("Enter S3 key prefix (or press Enter for root): ").strip() or ""
 
-                        fetch_logs_from_s3(db_manager, bucket, prefix, start_time, end_time, 'raw-logs')
+                        fetch_logs_from_s3(db_manager, bucket, prefix, start_time, end_time, 'raw-logs', args.raw_logs_format,
+                                           cluster_logs=args.cluster_logs)
 
                     else:
                         print("❌ Invalid choice")
@@ -1402,8 +1578,7 @@ def main():
 
                 elif choice == '4':
                     # Generate Excel Report
-                    stats = db_manager.get_database_stats()
-                    if stats.get('web_acls', 0) == 0:
+                    if not db_manager.has_web_acls():
                         print("\n⚠️  No data found in database.")
                         print("Please fetch WAF configurations first (Option 1)")
                         continue
@@ -1414,8 +1589,7 @@ def main():
                     output_path = f"{output_dir}/{account_identifier}_{timestamp}_waf_report.xlsx"
 
                     # Get list of Web ACLs for selection
-                    conn = db_manager.get_connection()
-                    web_acls = conn.execute("SELECT web_acl_id, name, scope FROM web_acls ORDER BY name").fetchall()
+                    web_acls = db_manager.list_web_acls()
 
                     if not web_acls:
                         print("\n⚠️  No Web ACLs found in database.")
@@ -1425,21 +1599,14 @@ def main():
                     # Display Web ACLs and let user select
                     print("\n📋 Available Web ACLs:")
                     print("="*80)
-                    for idx, (web_acl_id, name, scope) in enumerate(web_acls, 1):
-                        print(f"{idx}. {name} (Scope: {scope})")
-                    print(f"{len(web_acls) + 1}. All Web ACLs")
+                    lines = [f"{idx}. {name} (Scope: {scope})" for idx, (_, name, scope) in enumerate(web_acls, 1)]
+                    lines.append(f"{len(web_acls) + 1}. All Web ACLs")
+                    print("\n".join(lines))
                     print("="*80)
 
-                    while True:
-                        choice_input = input(f"\nSelect Web ACL to export (1-{len(web_acls) + 1}): ").strip()
-                        try:
-                            selection = int(choice_input)
-                            if 1 <= selection <= len(web_acls) + 1:
-                                break
-                            else:
-                                print(f"❌ Please enter a number between 1 and {len(web_acls) + 1}")
-                        except ValueError:
-                            print("❌ Please enter a valid number")
+                    selection = prompt_menu_number(
+                        f"\nSelect Web ACL to export (1-{len(web_acls) + 1}): ", len(web_acls) + 1
+                    )
 
                     # Determine which Web ACL(s) to export
                     if selection == len(web_acls) + 1:
@@ -1453,7 +1620,8 @@ def main():
                         selected_web_acl_ids = [selected_web_acl_id]
                         print(f"\n📊 Generating report for Web ACL: {selected_web_acl_name}...")
 
-                    generate_excel_report(db_manager, output_path, selected_web_acl_ids, session_info)
+                    generate_excel_report(db_manager, output_path, selected_web_acl_ids, session_info,
+                                          args.approximate_unique_ips)
 
                     print(f"\n✓ Excel report generated: {output_path}")
                     print("\nNext steps:")
@@ -1467,8 +1635,7 @@ def main():
                     print("\n" + "="*80)
                     print("📊 Database Statistics")
                     print("="*80)
-                    for table, count in stats.items():
-                        print(f"{table:30s}: {count:>10,} records")
+                    print("\n".join(f"{table:30s}: {count:>10,} records" for table, count in stats.items()))
                     print("="*80)
 
                 elif choice == '6':
@@ -1477,7 +1644,8 @@ def main():
 
                 elif choice == '7':
                     # Generate LLM Security Analysis
-                    generate_llm_analysis(db_manager, session_info, dir_paths, account_identifier)
+                    generate_llm_analysis(db_manager, session_info, dir_paths, account_identifier,
+                                          args.approximate_unique_ips)
 
                 else:
                     print("❌ Invalid choice. Please enter 0-7.")
@@ -1508,13 +1676,13 @@ def main():
                 if args.log_source == 'cloudwatch':
                     if not args.log_group:
                         # List available log groups
+                        from fetchers.cloudwatch_fetcher import CloudWatchFetcher
                         fetcher = CloudWatchFetcher()
-                        log_groups = fetcher.list_log_groups(prefix='aws-waf-logs')
+                        log_groups = fetcher.list_log_groups()
 
                         if log_groups:
                             print("\nAvailable WAF log groups:")
-                            for idx, lg in enumerate(log_groups, 1):
-                                print(f"{idx}. {lg['logGroupName']}")
+                            print("\n".join(f"{idx}. {lg['logGroupName']}" for idx, lg in enumerate(log_groups, 1)))
 
                             selection = input("\nEnter log group number or full name: ")
                             try:
@@ -1527,13 +1695,15 @@ def main():
                     else:
                         log_group_name = args.log_group
 
-                    fetch_logs_from_cloudwatch(db_manager, log_group_name, start_time, end_time, dir_paths.get('raw_logs'))
+                    fetch_logs_from_cloudwatch(db_manager, log_group_name, start_time, end_time, dir_paths.get('raw_logs'),
+                                               cluster_logs=args.cluster_logs)
 
                 elif args.log_source == 's3':
                     bucket = args.s3_bucket or input("Enter S3 bucket name: ")
                     prefix = args.s3_prefix or input("Enter S3 key prefix: ")
 
-                    fetch_logs_from_s3(db_manager, bucket, prefix, start_time, end_time, 'raw-logs')
+                    fetch_logs_from_s3(db_manager, bucket, prefix, start_time, end_time, 'raw-logs', args.raw_logs_format,
+                                       cluster_logs=args.cluster_logs)
 
                 else:
                     logger.error("Log source not specified. Use --log-source cloudwatch or --log-source s3")
@@ -1553,7 +1723,7 @@ def main():
                 output_dir = dir_paths.get('output', f'output/{account_identifier}')
                 output_path = f"{output_dir}/{account_identifier}_{timestamp}_waf_report.xlsx"
 
-            generate_excel_report(db_manager, output_path, None, session_info)
+            generate_excel_report(db_manager, output_path, None, session_info, args.approximate_unique_ips)
 
             # Show summary
             print("\n" + "="*60)
@@ -6,7 +6,12 @@ rules, resource associations, and logging configurations.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import List, Dict, Any, Optional, Tuple
 from botocore.exceptions import ClientError
 from tqdm import tqdm
 
@@ -19,6 +24,62 @@ from utils.aws_helpers import (
 
 logger = logging.getLogger(__name__)
 
+# Concurrent WAFv2 API calls; the client is thread-safe and calls are latency-bound
+CONFIG_FETCH_WORKERS = 16
+
+# Minimum seconds between progress bar redraws
+PROGRESS_MIN_INTERVAL = 0.5
+
+# WAFv2 ResourceType values that can be associated with a Web ACL, per scope
+_SCOPE_RESOURCE_TYPES = {
+    'REGIONAL': ('APPLICATION_LOAD_BALANCER', 'API_GATEWAY', 'APPSYNC', 'COGNITO_USER_POOL',
+                 'APP_RUNNER_SERVICE', 'VERIFIED_ACCESS_INSTANCE'),
+    'CLOUDFRONT': ('CLOUDFRONT',),
+}
+
+# Resource types rejected as unsupported, keyed by (scope, region); filled at runtime
+_unsupported_resource_types: Dict[Tuple[str, Optional[str]], set] = {}
+_unsupported_resource_types_lock = threading.Lock()
+
+
+def _is_unsupported_resource_type_error(error: ClientError) -> bool:
+    """
+    Check whether a ListResourcesForWebACL error rejects the resource type itself.
+
+    Invalid-parameter errors about other fields (e.g. a stale Web ACL ARN) only
+    concern the request that raised them and must not hide the type for other
+    Web ACLs.
+
+    Args:
+        error (ClientError): Error raised by list_resources_for_web_acl
+
+    Returns:
+        bool: True if the ResourceType value is not valid in this scope/region
+    """
+    error_code = error.response.get('Error', {}).get('Code')
+
+    if error_code == 'WAFInvalidParameterException':
+        return error.response.get('Field') == 'RESOURCE_TYPE'
+    if error_code == 'ValidationException':
+        return 'resourcetype' in error.response.get('Error', {}).get('Message', '').lower()
+    return False
+
+# Top-level rule statement key -> rule type, in classification precedence order
+_STATEMENT_RULE_TYPES = {
+    'ManagedRuleGroupStatement': 'MANAGED_RULE_GROUP',
+    'RateBasedStatement': 'RATE_BASED',
+    'RuleGroupReferenceStatement': 'RULE_GROUP_REFERENCE',
+    'GeoMatchStatement': 'GEO_MATCH',
+    'IPSetReferenceStatement': 'IP_SET',
+    'RegexPatternSetReferenceStatement': 'REGEX_PATTERN_SET',
+    'SizeConstraintStatement': 'SIZE_CONSTRAINT',
+    'SqliMatchStatement': 'SQLI_MATCH',
+    'XssMatchStatement': 'XSS_MATCH',
+    'ByteMatchStatement': 'BYTE_MATCH',
+}
+_STATEMENT_PRIORITY = {key: index for index, key in enumerate(_STATEMENT_RULE_TYPES)}
+_LOGICAL_STATEMENTS = frozenset({'AndStatement', 'OrStatement', 'NotStatement'})
+
 
 class WAFConfigProcessor:
     """
@@ -48,8 +109,7 @@ class WAFConfigProcessor:
         logger.info(f"Listing Web ACLs for {self.scope} scope")
 
         try:
-            response = self.client.list_web_acls(Scope=self.scope)
-            web_acls = response.get('WebACLs', [])
+            web_acls = self._list_all('list_web_acls', 'WebACLs')
 
             logger.info(f"Found {len(web_acls)} Web ACLs")
             return web_acls
@@ -58,6 +118,36 @@ class WAFConfigProcessor:
             handle_aws_error(e, "listing Web ACLs")
             return []
 
+    def _list_all(self, operation: str, result_key: str) -> List[Dict[str, Any]]:
+        """
+        Call a WAFv2 List* operation and follow NextMarker until all items are returned.
+
+        WAFv2 list operations return at most 100 items per call and botocore
+        does not ship paginators for them.
+
+        Args:
+            operation (str): Client method name (e.g. 'list_web_acls')
+            result_key (str): Response key holding the items (e.g. 'WebACLs')
+
+        Returns:
+            List[Dict[str, Any]]: All items across pages
+
+        Raises:
+            ClientError: Propagated from the underlying API call
+        """
+        list_method = getattr(self.client, operation)
+        kwargs = {'Scope': self.scope, 'Limit': 100}
+        items = []
+
+        while True:
+            response = list_method(**kwargs)
+            items.extend(response.get(result_key, []))
+
+            next_marker = response.get('NextMarker')
+            if not next_marker:
+                return items
+            kwargs['NextMarker'] = next_marker
+
     def get_web_acl(self, name: str, web_acl_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed configuration for a specific Web ACL.
@@ -107,15 +197,23 @@ class WAFConfigProcessor:
 
         web_acl_configs = []
 
-        for summary in tqdm(web_acl_summaries, desc="Fetching Web ACL configs"):
-            name = summary['Name']
-            web_acl_id = summary['Id']
+        # Fetch in parallel; map() keeps results in list_web_acls order
+        max_workers = min(CONFIG_FETCH_WORKERS, len(web_acl_summaries))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            configs = executor.map(
+                lambda summary: self.get_web_acl(summary['Name'], summary['Id']),
+                web_acl_summaries
+            )
 
-            config = self.get_web_acl(name, web_acl_id)
-            if config:
-                # Add summary information
-                config['_Summary'] = summary
-                web_acl_configs.append(config)
+            for summary, config in tqdm(zip(web_acl_summaries, configs),
+                                        total=len(web_acl_summaries),
+                                        desc="Fetching Web ACL configs",
+                                        mininterval=PROGRESS_MIN_INTERVAL,
+                                        disable=not sys.stderr.isatty()):
+                if config:
+                    # Add summary information
+                    config['_Summary'] = summary
+                    web_acl_configs.append(config)
 
         return web_acl_configs
 
@@ -123,6 +221,8 @@ class WAFConfigProcessor:
         """
         Get list of resources associated with a Web ACL.
 
+        Each supported resource type is queried concurrently.
+
         Args:
             web_acl_arn (str): Web ACL ARN
 
@@ -131,60 +231,102 @@ class WAFConfigProcessor:
         """
         logger.info(f"Fetching resources for Web ACL: {web_acl_arn}")
 
+        resource_types_to_check = self._supported_resource_types()
+
+        if len(resource_types_to_check) > 1:
+            with ThreadPoolExecutor(max_workers=len(resource_types_to_check)) as executor:
+                results = list(executor.map(
+                    lambda resource_type: self._list_resources(web_acl_arn, resource_type),
+                    resource_types_to_check
+                ))
+        else:
+            results = [self._list_resources(web_acl_arn, resource_type)
+                       for resource_type in resource_types_to_check]
+
+        resources = list(chain.from_iterable(results))
+
+        if resources:
+            logger.info(f"Total: Found {len(resources)} resources for Web ACL")
+        else:
+            logger.warning(f"No resources found for Web ACL {web_acl_arn}")
+            logger.info("This is normal if the Web ACL is not yet associated with any resources")
+
+        return resources
+
+    def _resource_type_cache_key(self) -> Tuple[str, Optional[str]]:
+        """
+        Build the (scope, region) key for the unsupported resource type cache.
+
+        Returns:
+            Tuple[str, Optional[str]]: Scope and the client's region
+        """
+        return self.scope, self.client.meta.region_name
+
+    def _supported_resource_types(self) -> List[str]:
+        """
+        Resource types worth querying for this scope and region.
+
+        Types that a previous call rejected as unsupported in the same scope and
+        region are skipped, so each Web ACL does not repeat the failing request.
+
+        Returns:
+            List[str]: WAFv2 ResourceType values to query
+        """
+        with _unsupported_resource_types_lock:
+            unsupported = set(_unsupported_resource_types.get(self._resource_type_cache_key(), ()))
+
+        return [resource_type for resource_type in _SCOPE_RESOURCE_TYPES.get(self.scope, ())
+                if resource_type not in unsupported]
+
+    def _list_resources(self, web_acl_arn: str, resource_type: str) -> List[str]:
+        """
+        List resources of one type associated with a Web ACL.
+
+        Args:
+            web_acl_arn (str): Web ACL ARN
+            resource_type (str): WAFv2 ResourceType value
+
+        Returns:
+            List[str]: Resource ARNs (empty if the type is unsupported or the call fails)
+        """
+        resources = []
+
         try:
-            resources = []
-            resource_types_to_check = []
-
-            # Determine which resource types to check based on scope
-            if self.scope == 'REGIONAL':
-                resource_types_to_check = ['APPLICATION_LOAD_BALANCER', 'API_GATEWAY', 'APPSYNC', 'COGNITO_USER_POOL', 'APP_RUNNER_SERVICE', 'VERIFIED_ACCESS_INSTANCE']
-            elif self.scope == 'CLOUDFRONT':
-                resource_types_to_check = ['CLOUDFRONT']
-
-            for resource_type in resource_types_to_check:
-                try:
-                    logger.debug(f"Checking resource type: {resource_type}")
-                    next_marker = None
-
-                    while True:
-                        kwargs = {
-                            'WebACLArn': web_acl_arn,
-                            'ResourceType': resource_type
-                        }
-
-                        if next_marker:
-                            kwargs['NextMarker'] = next_marker
-
-                        response = self.client.list_resources_for_web_acl(**kwargs)
-                        resource_arns = response.get('ResourceArns', [])
-
-                        if resource_arns:
-                            logger.info(f"Found {len(resource_arns)} resources of type {resource_type}")
-                            resources.extend(resource_arns)
-
-                        next_marker = response.get('NextMarker')
-                        if not next_marker:
-                            break
-
-                except ClientError as e:
-                    error_code = e.response.get('Error', {}).get('Code')
-                    if error_code in ['WAFInvalidParameterException', 'ValidationException']:
-                        # Resource type not supported in this region/scope, skip it
-                        logger.debug(f"Resource type {resource_type} not supported, skipping")
-                    else:
-                        logger.warning(f"Error fetching {resource_type} resources: {e}")
-
-            if resources:
-                logger.info(f"Total: Found {len(resources)} resources for Web ACL")
-            else:
-                logger.warning(f"No resources found for Web ACL {web_acl_arn}")
-                logger.info("This is normal if the Web ACL is not yet associated with any resources")
+            logger.debug(f"Checking resource type: {resource_type}")
+            next_marker = None
 
-            return resources
+            while True:
+                kwargs = {
+                    'WebACLArn': web_acl_arn,
+                    'ResourceType': resource_type
+                }
+
+                if next_marker:
+                    kwargs['NextMarker'] = next_marker
+
+                response = self.client.list_resources_for_web_acl(**kwargs)
+                resource_arns = response.get('ResourceArns', [])
+
+                if resource_arns:
+                    logger.info(f"Found {len(resource_arns)} resources of type {resource_type}")
+                    resources.extend(resource_arns)
+
+                next_marker = response.get('NextMarker')
+                if not next_marker:
+                    break
 
         except ClientError as e:
-            handle_aws_error(e, f"listing resources for Web ACL")
-            return []
+            if _is_unsupported_resource_type_error(e):
+                # Resource type not supported in this region/scope; skip it from now on
+                logger.debug(f"Resource type {resource_type} not supported, skipping")
+                with _unsupported_resource_types_lock:
+                    _unsupported_resource_types.setdefault(
+                        self._resource_type_cache_key(), set()
+                    ).add(resource_type)
+            else:
+                logger.warning(f"Error fetching {resource_type} resources: {e}")
+
+        return resources
 
     def get_logging_configuration(self, web_acl_arn: str) -> Optional[Dict[str, Any]]:
         """
@@ -217,6 +359,21 @@ class WAFConfigProcessor:
                 handle_aws_error(e, f"getting logging configuration")
                 return None
 
+    def get_resources_and_logging(self, web_acl_arn: str) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        """
+        Fetch associated resources and logging configuration for a Web ACL concurrently.
+
+        Args:
+            web_acl_arn (str): Web ACL ARN
+
+        Returns:
+            Tuple[List[str], Optional[Dict[str, Any]]]: Resource ARNs and logging configuration
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            resources_future = executor.submit(self.get_resources_for_web_acl, web_acl_arn)
+            logging_future = executor.submit(self.get_logging_configuration, web_acl_arn)
+            return resources_future.result(), logging_future.result()
+
     def get_complete_web_acl_info(self, web_acl_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Get complete information for a Web ACL including resources and logging.
@@ -232,20 +389,18 @@ class WAFConfigProcessor:
 
         logger.info(f"Gathering complete information for Web ACL: {web_acl_name}")
 
-        # Get associated resources
-        resources = self.get_resources_for_web_acl(web_acl_arn)
+        # Get associated resources and logging configuration
+        resources, logging_config = self.get_resources_and_logging(web_acl_arn)
 
         # Parse resource types
-        resource_details = []
-        for resource_arn in resources:
-            resource_details.append({
+        resource_details = [
+            {
                 'arn': resource_arn,
                 'type': determine_resource_type(resource_arn),
                 'parsed': parse_arn(resource_arn)
-            })
-
-        # Get logging configuration
-        logging_config = self.get_logging_configuration(web_acl_arn)
+            }
+            for resource_arn in resources
+        ]
 
         # Combine all information
         complete_info = {
@@ -258,42 +413,73 @@ class WAFConfigProcessor:
 
         return complete_info
 
-    def extract_rules_from_web_acl(self, web_acl_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def process_web_acl(self, web_acl_config: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
-        Extract and process rules from a Web ACL configuration.
+        Extract rules and analyze complexity of a Web ACL in a single pass over its rules.
 
         Args:
             web_acl_config (Dict[str, Any]): Web ACL configuration
 
         Returns:
-            List[Dict[str, Any]]: List of processed rules
+            Tuple[List[Dict[str, Any]], Dict[str, Any]]: Processed rules and complexity analysis
         """
         rules = web_acl_config.get('Rules', [])
         processed_rules = []
+        rule_types = Counter()
+
+        determine_statement_type = self._determine_statement_type
+        append_rule = processed_rules.append
 
         for rule in rules:
+            get = rule.get
+            statement = get('Statement') or {}
+            rule_type = determine_statement_type(statement)
+            rule_types[rule_type] += 1
+
             processed_rule = {
-                'Name': rule.get('Name'),
-                'Priority': rule.get('Priority'),
-                'Action': rule.get('Action', {}),
-                'VisibilityConfig': rule.get('VisibilityConfig', {}),
-                'Statement': rule.get('Statement', {}),
-                'Type': self._determine_rule_type(rule)
+                'Name': get('Name'),
+                'Priority': get('Priority'),
+                'Action': get('Action', {}),
+                'VisibilityConfig': get('VisibilityConfig', {}),
+                'Statement': statement,
+                'Type': rule_type
             }
 
             # Extract managed rule group info if applicable
-            statement = rule.get('Statement', {})
-            if 'ManagedRuleGroupStatement' in statement:
-                mrg = statement['ManagedRuleGroupStatement']
+            mrg = statement.get('ManagedRuleGroupStatement')
+            if mrg is not None:
                 processed_rule['ManagedRuleGroup'] = {
                     'VendorName': mrg.get('VendorName'),
                     'Name': mrg.get('Name'),
                     'Version': mrg.get('Version')
                 }
 
-            processed_rules.append(processed_rule)
+            append_rule(processed_rule)
 
-        return processed_rules
+        analysis = {
+            'total_rules': len(rules),
+            'capacity_used': web_acl_config.get('Capacity', 0),
+            'rule_types': dict(rule_types),
+            'has_rate_limiting': 'RATE_BASED' in rule_types,
+            'has_geo_blocking': 'GEO_MATCH' in rule_types,
+            'has_ip_filtering': 'IP_SET' in rule_types,
+            'managed_rule_groups': rule_types.get('MANAGED_RULE_GROUP', 0),
+            'default_action': web_acl_config.get('DefaultAction', {})
+        }
+
+        return processed_rules, analysis
+
+    def extract_rules_from_web_acl(self, web_acl_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Extract and process rules from a Web ACL configuration.
+
+        Args:
+            web_acl_config (Dict[str, Any]): Web ACL configuration
+
+        Returns:
+            List[Dict[str, Any]]: List of processed rules
+        """
+        return self.process_web_acl(web_acl_config)[0]
 
     def _determine_rule_type(self, rule: Dict[str, Any]) -> str:
         """
@@ -305,32 +491,27 @@ class WAFConfigProcessor:
         Returns:
             str: Rule type classification
         """
-        statement = rule.get('Statement', {})
-
-        if 'ManagedRuleGroupStatement' in statement:
-            return 'MANAGED_RULE_GROUP'
-        elif 'RateBasedStatement' in statement:
-            return 'RATE_BASED'
-        elif 'RuleGroupReferenceStatement' in statement:
-            return 'RULE_GROUP_REFERENCE'
-        elif 'GeoMatchStatement' in statement:
-            return 'GEO_MATCH'
-        elif 'IPSetReferenceStatement' in statement:
-            return 'IP_SET'
-        elif 'RegexPatternSetReferenceStatement' in statement:
-            return 'REGEX_PATTERN_SET'
-        elif 'SizeConstraintStatement' in statement:
-            return 'SIZE_CONSTRAINT'
-        elif 'SqliMatchStatement' in statement:
-            return 'SQLI_MATCH'
-        elif 'XssMatchStatement' in statement:
-            return 'XSS_MATCH'
-        elif 'ByteMatchStatement' in statement:
-            return 'BYTE_MATCH'
-        elif 'AndStatement' in statement or 'OrStatement' in statement or 'NotStatement' in statement:
+        return self._determine_statement_type(rule.get('Statement') or {})
+
+    def _determine_statement_type(self, statement: Dict[str, Any]) -> str:
+        """
+        Determine the rule type from an already extracted rule statement.
+
+        Args:
+            statement (Dict[str, Any]): Top-level rule statement
+
+        Returns:
+            str: Rule type classification
+        """
+        matches = statement.keys() & _STATEMENT_RULE_TYPES.keys()
+        if matches:
+            # A top-level statement normally has a single key; if not, the
+            # earliest entry in _STATEMENT_RULE_TYPES wins
+            key = next(iter(matches)) if len(matches) == 1 else min(matches, key=_STATEMENT_PRIORITY.__getitem__)
+            return _STATEMENT_RULE_TYPES[key]
+        if statement.keys() & _LOGICAL_STATEMENTS:
             return 'LOGICAL'
-        else:
-            return 'CUSTOM'
+        return 'CUSTOM'
 
     def get_ip_sets(self) -> List[Dict[str, Any]]:
         """
@@ -342,8 +523,7 @@ class WAFConfigProcessor:
         logger.info(f"Listing IP sets for {self.scope} scope")
 
         try:
-            response = self.client.list_ip_sets(Scope=self.scope)
-            ip_sets = response.get('IPSets', [])
+            ip_sets = self._list_all('list_ip_sets', 'IPSets')
 
             logger.info(f"Found {len(ip_sets)} IP sets")
             return ip_sets
@@ -362,8 +542,7 @@ class WAFConfigProcessor:
         logger.info(f"Listing regex pattern sets for {self.scope} scope")
 
         try:
-            response = self.client.list_regex_pattern_sets(Scope=self.scope)
-            pattern_sets = response.get('RegexPatternSets', [])
+            pattern_sets = self._list_all('list_regex_pattern_sets', 'RegexPatternSets')
 
             logger.info(f"Found {len(pattern_sets)} regex pattern sets")
             return pattern_sets
@@ -382,8 +561,7 @@ class WAFConfigProcessor:
         logger.info(f"Listing rule groups for {self.scope} scope")
 
         try:
-            response = self.client.list_rule_groups(Scope=self.scope)
-            rule_groups = response.get('RuleGroups', [])
+            rule_groups = self._list_all('list_rule_groups', 'RuleGroups')
 
             logger.info(f"Found {len(rule_groups)} rule groups")
             return rule_groups
@@ -402,22 +580,4 @@ class WAFConfigProcessor:
         Returns:
             Dict[str, Any]: Complexity analysis
         """
-        rules = web_acl_config.get('Rules', [])
-
-        rule_types = {}
-        for rule in rules:
-            rule_type = self._determine_rule_type(rule)
-            rule_types[rule_type] = rule_types.get(rule_type, 0) + 1
-
-        analysis = {
-            'total_rules': len(rules),
-            'capacity_used': web_acl_config.get('Capacity', 0),
-            'rule_types': rule_types,
-            'has_rate_limiting': 'RATE_BASED' in rule_types,
-            'has_geo_blocking': 'GEO_MATCH' in rule_types,
-            'has_ip_filtering': 'IP_SET' in rule_types,
-            'managed_rule_groups': rule_types.get('MANAGED_RULE_GROUP', 0),
-            'default_action': web_acl_config.get('DefaultAction', {})
-        }
-
-        return analysis
+        return self.process_web_acl(web_acl_config)[1]
@@ -7,14 +7,103 @@ normalizes them according to the official WAF log schema.
 
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 
+from utils.json_helpers import loads_json
 from utils.time_helpers import parse_iso_timestamp, timestamp_to_datetime
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on distinct strings kept in a parser's string pool
+STRING_POOL_MAX_SIZE = 100000
+
+# Events in a batch share timestamps heavily (same millisecond / same second),
+# so conversions are memoized; both return immutable datetimes
+_timestamp_to_datetime = lru_cache(maxsize=4096)(timestamp_to_datetime)
+_parse_iso_timestamp = lru_cache(maxsize=4096)(parse_iso_timestamp)
+
+# Rule ID substrings that indicate an attack type, in classification precedence order
+_ATTACK_TYPE_TOKENS = (
+    (('sqli', 'sql'), 'SQL Injection'),
+    (('xss',), 'Cross-Site Scripting'),
+    (('rfi', 'lfi'), 'File Inclusion'),
+    (('rce', 'command'), 'Remote Code Execution'),
+    (('scanner', 'recon'), 'Scanner/Reconnaissance'),
+    (('bot',), 'Bot Traffic'),
+    (('geo',), 'Geographic Block'),
+    (('rate',), 'Rate Limiting'),
+    (('ip',), 'IP Reputation'),
+)
+_ATTACK_TYPE_BY_TOKEN = {token: label for tokens, label in _ATTACK_TYPE_TOKENS for token in tokens}
+_ATTACK_TYPE_PRIORITY = {label: index for index, (_, label) in enumerate(_ATTACK_TYPE_TOKENS)}
+
+# Zero-width lookahead so overlapping tokens are all found in a single scan
+_ATTACK_TYPE_RE = re.compile(
+    '(?=(' + '|'.join(sorted(map(re.escape, _ATTACK_TYPE_BY_TOKEN), key=len, reverse=True)) + '))'
+)
+
+
+class _StringPool(dict):
+    """
+    Maps each string to one shared instance of itself.
+
+    Country codes, actions, methods, rule IDs and User-Agents repeat across most
+    log entries; sharing one object per distinct value keeps large batches of
+    parsed entries smaller. Hits are plain dict lookups with no Python-level
+    call; non-strings and values beyond STRING_POOL_MAX_SIZE pass through.
+    """
+
+    def __missing__(self, key: Any) -> Any:
+        if key.__class__ is str and len(self) < STRING_POOL_MAX_SIZE:
+            self[key] = key
+        return key
+
+
+@lru_cache(maxsize=1024)
+def _classify_attack_type(rule_id: str) -> str:
+    """
+    Map a terminating rule ID to an attack type, memoized per rule ID.
+
+    A Web ACL has few distinct terminating rules, so nearly every call is a
+    cache hit and the rule ID is scanned once per distinct value.
+
+    Args:
+        rule_id (str): Terminating rule ID
+
+    Returns:
+        str: Attack type classification
+    """
+    # Collect every attack type whose pattern occurs in the rule ID, then apply precedence
+    labels = {_ATTACK_TYPE_BY_TOKEN[match.group(1)]
+              for match in _ATTACK_TYPE_RE.finditer(rule_id.lower())}
+    if not labels:
+        return 'Other'
+    return min(labels, key=_ATTACK_TYPE_PRIORITY.__getitem__)
+
+
+@lru_cache(maxsize=8)
+def _load_schema_cached(schema_path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Read and decode a schema file, memoized per path and modification time.
+
+    The returned dict is shared between parser instances and must not be mutated.
+
+    Args:
+        schema_path (str): Path to schema file
+        mtime (float): File modification time, so edits invalidate the cache entry
+
+    Returns:
+        Dict[str, Any]: Schema definition
+    """
+    with open(schema_path, 'rb') as f:
+        return loads_json(f.read())
+
 
 class WAFLogParser:
     """
@@ -30,8 +119,18 @@ class WAFLogParser:
         """
         self.schema = self._load_schema(schema_path)
         self.required_fields = self.schema.get('required_fields', [])
+        # Pre-split nested field paths (e.g. httpRequest.clientIp) once for validate_log_entry()
+        self._required_paths = [
+            (field, tuple(field.split('.')) if '.' in field else None)
+            for field in self.required_fields
+        ]
         self.security_fields = self.schema.get('security_fields', [])
-        self.action_values = self.schema.get('action_values', [])
+        # Checked once per log entry; a frozenset keeps the lookup O(1)
+        self.action_values = frozenset(self.schema.get('action_values', []))
+        # Known action -> its canonical string; one lookup both validates and dedupes
+        self._action_lookup = {action: action for action in self.action_values}
+        # Canonical copies of highly repetitive string values
+        self._string_pool = _StringPool()
         logger.info("WAF log parser initialized")
 
     def _load_schema(self, schema_path: str) -> Dict[str, Any]:
@@ -45,8 +144,7 @@ class WAFLogParser:
             Dict[str, Any]: Schema definition
         """
         try:
-            with open(schema_path, 'r') as f:
-                schema = json.load(f)
+            schema = _load_schema_cached(schema_path, os.path.getmtime(schema_path))
             logger.info(f"Loaded WAF schema from {schema_path}")
             return schema
         except FileNotFoundError:
@@ -74,12 +172,12 @@ class WAFLogParser:
 
             if not message:
                 logger.warning("Empty message in CloudWatch event")
-                logger.debug(f"Event keys: {list(event.keys())}")
+                logger.debug("Event keys: %s", list(event.keys()))
                 return None
 
             # Parse the JSON message
             if isinstance(message, str):
-                log_entry = json.loads(message)
+                log_entry = loads_json(message)
             elif isinstance(message, dict):
                 log_entry = message
             else:
@@ -102,10 +200,10 @@ class WAFLogParser:
             return self.normalize_log_entry(log_entry)
 
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse CloudWatch event message: {e}")
+            logger.error("Failed to parse CloudWatch event message: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Error parsing CloudWatch event: {e}")
+            logger.error("Error parsing CloudWatch event: %s", e)
             return None
 
     def parse_s3_log_entry(self, log_entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -126,7 +224,7 @@ class WAFLogParser:
             return self.normalize_log_entry(log_entry)
 
         except Exception as e:
-            logger.error(f"Error parsing S3 log entry: {e}")
+            logger.error("Error parsing S3 log entry: %s", e)
             return None
 
     def normalize_log_entry(self, log_entry: Dict[str, Any]) -> Dict[str, Any]:
@@ -140,14 +238,15 @@ class WAFLogParser:
             Dict[str, Any]: Normalized log entry
         """
         normalized = {}
+        string_pool = self._string_pool
 
         # Parse timestamp efficiently
         timestamp = log_entry.get('timestamp')
         if timestamp:
             if isinstance(timestamp, int):
-                normalized['timestamp'] = timestamp_to_datetime(timestamp)
+                normalized['timestamp'] = _timestamp_to_datetime(timestamp)
             elif isinstance(timestamp, str):
-                normalized['timestamp'] = parse_iso_timestamp(timestamp)
+                normalized['timestamp'] = _parse_iso_timestamp(timestamp)
             else:
                 normalized['timestamp'] = timestamp
         else:
@@ -156,10 +255,11 @@ class WAFLogParser:
 
         # Extract action
         action = log_entry.get('action', '')
-        if action in self.action_values:
-            normalized['action'] = action
+        known_action = self._action_lookup.get(action)
+        if known_action is not None:
+            normalized['action'] = known_action
         else:
-            logger.warning(f"Unknown action value: {action}")
+            logger.warning("Unknown action value: %s", action)
             normalized['action'] = action or 'UNKNOWN'
 
         # Extract Web ACL information
@@ -177,9 +277,9 @@ class WAFLogParser:
         http_request = log_entry.get('httpRequest', {})
 
         normalized['clientIp'] = http_request.get('clientIp') or log_entry.get('clientIp')
-        normalized['country'] = http_request.get('country') or log_entry.get('country')
+        normalized['country'] = string_pool[http_request.get('country') or log_entry.get('country')]
         normalized['uri'] = http_request.get('uri') or log_entry.get('uri')
-        normalized['httpMethod'] = http_request.get('httpMethod') or log_entry.get('httpMethod')
+        normalized['httpMethod'] = string_pool[http_request.get('httpMethod') or log_entry.get('httpMethod')]
         normalized['httpVersion'] = http_request.get('httpVersion') or log_entry.get('httpVersion')
 
         # Extract headers
@@ -187,21 +287,21 @@ class WAFLogParser:
         normalized['httpRequest'] = http_request
         normalized['requestHeaders'] = headers
 
-        # Find User-Agent header efficiently
+        # Find User-Agent header, stopping at the first match
         user_agent = None
         if headers:  # Only search if headers exist
             for header in headers:
-                if header.get('name', '').lower() == 'user-agent':
+                if (header.get('name') or '').lower() == 'user-agent':
                     user_agent = header.get('value')
                     break
-        normalized['userAgent'] = user_agent
+        normalized['userAgent'] = string_pool[user_agent]
 
         # Extract HTTP status
         normalized['httpStatus'] = log_entry.get('httpStatus')
         normalized['responseCodeSent'] = log_entry.get('responseCodeSent')
 
         # Extract terminating rule information
-        normalized['terminatingRuleId'] = log_entry.get('terminatingRuleId')
+        normalized['terminatingRuleId'] = string_pool[log_entry.get('terminatingRuleId')]
         normalized['terminatingRuleType'] = log_entry.get('terminatingRuleType')
         normalized['terminatingRuleMatchDetails'] = log_entry.get('terminatingRuleMatchDetails')
 
@@ -243,9 +343,24 @@ class WAFLogParser:
         """
         logger.info(f"Parsing batch of {len(log_entries)} log entries from {source}")
 
-        parsed_entries = []
-        errors = 0
+        parsed_entries = list(self.parse_stream(log_entries, source))
+        errors = len(log_entries) - len(parsed_entries)
+
+        logger.info(f"Successfully parsed {len(parsed_entries)} entries, {errors} errors")
+        return parsed_entries
+
+    def parse_stream(self, log_entries: Iterable[Dict[str, Any]],
+                     source: str = 'unknown') -> Iterator[Dict[str, Any]]:
+        """
+        Lazily parse log entries, skipping any that fail to parse.
+
+        Args:
+            log_entries (Iterable[Dict[str, Any]]): Raw log entries
+            source (str): Source of the logs ('cloudwatch' or 's3')
 
+        Yields:
+            Dict[str, Any]: Parsed log entries
+        """
         # Choose parsing method based on source
         if source == 'cloudwatch':
             parse_method = self.parse_cloudwatch_event
@@ -257,18 +372,12 @@ class WAFLogParser:
         for entry in log_entries:
             try:
                 parsed = parse_method(entry)
-
-                if parsed:
-                    parsed_entries.append(parsed)
-                else:
-                    errors += 1
-
             except Exception as e:
-                logger.error(f"Error parsing log entry: {e}")
-                errors += 1
+                logger.error("Error parsing log entry: %s", e)
+                continue
 
-        logger.info(f"Successfully parsed {len(parsed_entries)} entries, {errors} errors")
-        return parsed_entries
+            if parsed:
+                yield parsed
 
     def validate_log_entry(self, log_entry: Dict[str, Any]) -> bool:
         """
@@ -281,10 +390,9 @@ class WAFLogParser:
             bool: True if valid, False otherwise
         """
         # Check required fields
-        for field in self.required_fields:
+        for field, parts in self._required_paths:
             # Handle nested fields (e.g., httpRequest.clientIp)
-            if '.' in field:
-                parts = field.split('.')
+            if parts:
                 value = log_entry
                 for part in parts:
                     value = value.get(part, {})
@@ -292,17 +400,17 @@ class WAFLogParser:
                         break
 
                 if not value:
-                    logger.warning(f"Missing required field: {field}")
+                    logger.warning("Missing required field: %s", field)
                     return False
             else:
                 if field not in log_entry or log_entry[field] is None:
-                    logger.warning(f"Missing required field: {field}")
+                    logger.warning("Missing required field: %s", field)
                     return False
 
         # Validate action value
         action = log_entry.get('action')
         if action and action not in self.action_values:
-            logger.warning(f"Invalid action value: {action}")
+            logger.warning("Invalid action value: %s", action)
             return False
 
         return True
@@ -320,29 +428,7 @@ class WAFLogParser:
         if log_entry.get('action') != 'BLOCK':
             return 'N/A'
 
-        terminating_rule = log_entry.get('terminatingRuleId', '').lower()
-
-        # Common attack type patterns in rule IDs
-        if 'sqli' in terminating_rule or 'sql' in terminating_rule:
-            return 'SQL Injection'
-        elif 'xss' in terminating_rule:
-            return 'Cross-Site Scripting'
-        elif 'rfi' in terminating_rule or 'lfi' in terminating_rule:
-            return 'File Inclusion'
-        elif 'rce' in terminating_rule or 'command' in terminating_rule:
-            return 'Remote Code Execution'
-        elif 'scanner' in terminating_rule or 'recon' in terminating_rule:
-            return 'Scanner/Reconnaissance'
-        elif 'bot' in terminating_rule:
-            return 'Bot Traffic'
-        elif 'geo' in terminating_rule:
-            return 'Geographic Block'
-        elif 'rate' in terminating_rule:
-            return 'Rate Limiting'
-        elif 'ip' in terminating_rule:
-            return 'IP Reputation'
-        else:
-            return 'Other'
+        return _classify_attack_type(log_entry.get('terminatingRuleId', ''))
 
     def extract_rule_groups_hit(self, log_entry: Dict[str, Any]) -> List[str]:
         """
@@ -384,43 +470,24 @@ class WAFLogParser:
                 'time_range': None
             }
 
-        actions = {}
-        ips = set()
-        countries = set()
-        timestamps = []
+        actions = Counter(entry.get('action', 'UNKNOWN') for entry in log_entries)
 
-        for entry in log_entries:
-            # Count actions
-            action = entry.get('action', 'UNKNOWN')
-            actions[action] = actions.get(action, 0) + 1
-
-            # Collect unique IPs
-            client_ip = entry.get('clientIp')
-            if client_ip:
-                ips.add(client_ip)
-
-            # Collect unique countries
-            country = entry.get('country')
-            if country:
-                countries.add(country)
-
-            # Collect timestamps
-            timestamp = entry.get('timestamp')
-            if timestamp:
-                timestamps.append(timestamp)
-
-        # Determine time range
+        # Collect unique IPs and countries
+        ips = {client_ip for entry in log_entries if (client_ip := entry.get('clientIp'))}
+        countries = {country for entry in log_entries if (country := entry.get('country'))}
+
+        # Determine time range (only the bounds are needed, so no sort)
+        timestamps = [timestamp for entry in log_entries if (timestamp := entry.get('timestamp'))]
         time_range = None
         if timestamps:
-            timestamps.sort()
             time_range = {
-                'start': timestamps[0],
-                'end': timestamps[-1]
+                'start': min(timestamps),
+                'end': max(timestamps)
             }
 
         summary = {
             'total_entries': len(log_entries),
-            'actions': actions,
+            'actions': dict(actions),
             'unique_ips': len(ips),
             'unique_countries': len(countries),
             'time_range': time_range,
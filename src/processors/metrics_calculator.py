@@ -5,106 +5,519 @@ This module calculates security metrics and analytics from WAF data stored
 in DuckDB. It provides methods for generating statistics, trends, and insights.
 """
 
+import copy
+import hashlib
+import json
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, datetime
 import pandas as pd
 
 from storage.duckdb_manager import DuckDBManager
 
 logger = logging.getLogger(__name__)
 
+# Attack type classification by lowercase substrings of the terminating rule ID,
+# in precedence order (first match wins); unmatched rule IDs count as 'Other'
+ATTACK_TYPE_RULE_PATTERNS = (
+    ('SQL Injection', ('sqli', 'sql')),
+    ('Cross-Site Scripting', ('xss',)),
+    ('Scanner/Reconnaissance', ('scanner', 'recon')),
+    ('Bot Traffic', ('bot',)),
+    ('Geographic Block', ('geo',)),
+    ('Rate Limiting', ('rate',)),
+    ('IP Reputation', ('ip', 'reputation')),
+    ('File Inclusion', ('rfi', 'lfi')),
+    ('Remote Code Execution', ('rce', 'command')),
+)
+
+# Report order of attack types (precedence order, then the 'Other' fallback)
+_ATTACK_TYPE_ORDER = tuple(attack_type for attack_type, _ in ATTACK_TYPE_RULE_PATTERNS) + ('Other',)
+
+# SQL CASE expression implementing ATTACK_TYPE_RULE_PATTERNS inside DuckDB
+_ATTACK_TYPE_CASE_SQL = "CASE {} ELSE 'Other' END".format(' '.join(
+    "WHEN {} THEN '{}'".format(
+        ' OR '.join(f"contains(lower(terminating_rule_id), '{token}')" for token in tokens),
+        attack_type
+    )
+    for attack_type, tokens in ATTACK_TYPE_RULE_PATTERNS
+))
+
+# Columns and dtypes of get_daily_traffic_trends() results, used for the empty frame
+_DAILY_TRENDS_DTYPES = {
+    'date': 'datetime64[us]',
+    'total_requests': 'int64',
+    'blocked': 'int64',
+    'allowed': 'int64',
+    'unique_ips': 'int64',
+    'block_rate_percent': 'float64',
+}
+
+# Directory name (next to the database file) for persisted calculate_all_metrics() results
+METRICS_CACHE_DIRNAME = '.metrics_cache'
+
+# Bump when the layout of the metrics dataset or cache files changes so older cache files are ignored
+METRICS_CACHE_VERSION = 3
+
+# Fingerprint of the tables calculate_all_metrics() reads; any change invalidates the disk cache.
+# Summed row hashes also catch updates that keep row counts, such as edited Web ACLs,
+# replaced resource associations or Web ACL ID migrations of stored logs
+_CACHE_STATE_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM waf_logs),
+        (SELECT MAX(timestamp) FROM waf_logs),
+        (SELECT SUM(hash(log_id, web_acl_id)) FROM waf_logs),
+        (SELECT SUM(hash(w)) FROM web_acls w),
+        (SELECT SUM(hash(r)) FROM resource_associations r),
+        (SELECT SUM(hash(l)) FROM logging_configurations l)
+"""
+
+
+def _encode_cache_value(value: Any) -> Any:
+    """
+    Convert a metrics value into JSON-compatible data for the disk cache.
+
+    Datetimes, dates and DataFrames are stored as single-key tagged objects so
+    _decode_cache_value() can restore them with their original types.
+
+    Args:
+        value (Any): Metrics value
+
+    Returns:
+        Any: JSON-compatible representation
+
+    Raises:
+        TypeError: If the value (or a nested value) cannot be restored exactly
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise TypeError("metrics cache only supports string dictionary keys")
+        return {key: _encode_cache_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode_cache_value(item) for item in value]
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, pd.DataFrame):
+        columns = {}
+        for column in value.columns:
+            series = value[column]
+            # Naive datetime columns are stored as integers in their own unit
+            if pd.api.types.is_datetime64_dtype(series.dtype):
+                series = series.astype('int64')
+            columns[column] = series.tolist()
+        return {'__dataframe__': {
+            'dtypes': {column: str(dtype) for column, dtype in value.dtypes.items()},
+            'columns': columns
+        }}
+    raise TypeError(f"metrics cache cannot store values of type {type(value).__name__}")
+
+
+def _decode_cache_value(value: Any) -> Any:
+    """
+    Restore a metrics value written by _encode_cache_value().
+
+    Args:
+        value (Any): JSON-compatible representation
+
+    Returns:
+        Any: Metrics value
+    """
+    if isinstance(value, list):
+        return [_decode_cache_value(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    if len(value) == 1:
+        tag, payload = next(iter(value.items()))
+        if tag == '__datetime__':
+            return datetime.fromisoformat(payload)
+        if tag == '__date__':
+            return date.fromisoformat(payload)
+        if tag == '__dataframe__':
+            dtypes = payload['dtypes']
+            return pd.DataFrame({
+                column: pd.Series(
+                    values,
+                    dtype='int64' if pd.api.types.is_datetime64_dtype(dtypes[column]) else dtypes[column]
+                ).astype(dtypes[column])
+                for column, values in payload['columns'].items()
+            })
+
+    return {key: _decode_cache_value(item) for key, item in value.items()}
+
 
 class MetricsCalculator:
     """
     Calculates security metrics and analytics from WAF data.
     """
 
-    def __init__(self, db_manager: DuckDBManager, web_acl_ids: Optional[List[str]] = None):
+    def __init__(self, db_manager: DuckDBManager, web_acl_ids: Optional[List[str]] = None,
+                 cache_dir: Optional[str] = None, approximate_unique_ips: bool = False):
         """
         Initialize the metrics calculator.
 
         Args:
             db_manager (DuckDBManager): Database manager instance
             web_acl_ids (Optional[List[str]]): List of Web ACL IDs to filter by. If None, includes all Web ACLs.
+            cache_dir (Optional[str]): Directory for persisting calculate_all_metrics() results between
+                runs. If None, every call recomputes the metrics.
+            approximate_unique_ips (bool): Estimate the summary's total unique client IP count with
+                DuckDB's HyperLogLog approx_count_distinct() instead of an exact COUNT(DISTINCT);
+                per-rule, per-country and per-day counts stay exact
         """
         self.db = db_manager
         self.web_acl_ids = web_acl_ids
+        self.cache_dir = cache_dir
+        self.approximate_unique_ips = approximate_unique_ips
+        # SQL aggregate for the full-table unique client IP count in the summary metrics
+        self._summary_unique_ips_sql = 'approx_count_distinct(client_ip)' if approximate_unique_ips else 'COUNT(DISTINCT client_ip)'
+        # Web ACL filter as a whole WHERE clause and as an AND suffix for existing
+        # WHERE clauses; both are empty when no filter is set
+        web_acl_condition = self._build_web_acl_condition()
+        self._where_filter = f"WHERE {web_acl_condition}" if web_acl_condition else ""
+        self._and_filter = f" AND {web_acl_condition}" if web_acl_condition else ""
+        self._local = threading.local()
+        # Results of getters that other metrics reuse; see _cached() / invalidate()
+        self._cache: Dict[str, Any] = {}
+        self._cache_locks: Dict[str, threading.Lock] = {}
+        self._cache_lock = threading.Lock()
+        # Count-only metrics read the rollups from DuckDBManager.build_summary_tables() when present
+        self.use_summary_tables = db_manager.has_summary_tables()
         if web_acl_ids:
             logger.info(f"Metrics calculator initialized with filter for {len(web_acl_ids)} Web ACL(s)")
         else:
             logger.info("Metrics calculator initialized")
 
-    def _get_web_acl_filter(self) -> str:
+    def invalidate(self) -> None:
+        """
+        Drop memoized metric results so the next call re-queries the database.
         """
-        Generate WHERE clause for filtering by Web ACL IDs.
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _cached(self, name: str, compute):
+        """
+        Return a memoized metric result, computing it at most once per instance.
+
+        Concurrent callers of the same metric wait for a single computation.
+        Each caller receives its own deep copy, so mutating a result does not
+        affect the cache.
+
+        Args:
+            name (str): Cache key
+            compute: Zero-argument callable producing the result
 
         Returns:
-            str: WHERE clause string (e.g., "WHERE web_acl_id IN ('id1', 'id2')") or empty string
+            Any: Copy of the cached result
+        """
+        with self._cache_lock:
+            key_lock = self._cache_locks.setdefault(name, threading.Lock())
+
+        with key_lock:
+            if name not in self._cache:
+                self._cache[name] = compute()
+            return copy.deepcopy(self._cache[name])
+
+    def _has_data(self) -> bool:
+        """
+        Check whether waf_logs holds any rows for the selected Web ACLs (memoized per instance).
+
+        Log-based getters return their empty result without querying when this is False.
+
+        Returns:
+            bool: True if at least one log row is in scope
+        """
+        return self._cached('has_data', self._compute_has_data)
+
+    def _compute_has_data(self) -> bool:
+        """
+        Query whether any log row is in scope.
+
+        Returns:
+            bool: True if at least one log row is in scope
+        """
+        query = f"SELECT EXISTS (SELECT 1 FROM waf_logs {self._where_filter})"
+        return bool(self._get_connection().execute(query).fetchone()[0])
+
+    def _build_web_acl_condition(self) -> str:
+        """
+        Generate the SQL condition for filtering by Web ACL IDs.
+
+        Returns:
+            str: Condition string (e.g., "web_acl_id IN ('id1', 'id2')") or empty string
         """
         if self.web_acl_ids:
             # Escape single quotes in IDs and format as SQL IN clause
             escaped_ids = [id.replace("'", "''") for id in self.web_acl_ids]
             ids_str = "', '".join(escaped_ids)
-            return f"WHERE web_acl_id IN ('{ids_str}')"
+            return f"web_acl_id IN ('{ids_str}')"
         return ""
 
-    def calculate_all_metrics(self) -> Dict[str, Any]:
+    def _get_connection(self):
+        """
+        Get the connection for the current thread.
+
+        Worker threads started by calculate_all_metrics() use their own DuckDB
+        cursor; everything else shares the manager's connection.
+
+        Returns:
+            duckdb.DuckDBPyConnection: Database connection or cursor
+        """
+        cursor = getattr(self._local, 'cursor', None)
+        return cursor if cursor is not None else self.db.get_connection()
+
+    def _fetch_records(self, query: str, params: Optional[List[Any]] = None,
+                       round_columns: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+        """
+        Run a query and return its rows as dictionaries keyed by column alias.
+
+        Args:
+            query (str): SQL query whose column aliases are the output keys
+            params (Optional[List[Any]]): Values for the query's ``?`` placeholders
+            round_columns (Tuple[str, ...]): Percentage columns to round to 2 decimals
+                with Python's round() (ties to even, unlike SQL ROUND)
+
+        Returns:
+            List[Dict[str, Any]]: One dictionary per result row
+        """
+        connection = self._get_connection()
+        result = connection.execute(query, params) if params else connection.execute(query)
+        columns = [column[0] for column in result.description]
+        records = [dict(zip(columns, row)) for row in result.fetchall()]
+
+        for record in records:
+            for column in round_columns:
+                record[column] = round(record[column], 2)
+
+        return records
+
+    def _run_with_cursor(self, getter, *args, **kwargs):
+        """
+        Run a metric getter on a dedicated DuckDB cursor for the calling thread.
+
+        Args:
+            getter: Bound metric method to call
+            *args: Positional arguments for the getter
+            **kwargs: Keyword arguments for the getter
+
+        Returns:
+            Any: The getter's result
+        """
+        cursor = self.db.get_connection().cursor()
+        self._local.cursor = cursor
+        try:
+            return getter(*args, **kwargs)
+        finally:
+            self._local.cursor = None
+            cursor.close()
+
+    def calculate_all_metrics(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
         """
         Calculate all available metrics.
 
+        The metric queries are independent read-only scans, so they are run
+        concurrently on a thread pool with one DuckDB cursor per task.
+
+        Args:
+            max_workers (Optional[int]): Maximum number of worker threads (default: CPU count)
+
         Returns:
             Dict[str, Any]: Complete metrics dataset
         """
+        cache_path = self._disk_cache_path() if self.cache_dir else None
+        if cache_path:
+            metrics = self._load_disk_cache(cache_path)
+            if metrics is not None:
+                logger.info(f"Loaded metrics from cache: {cache_path}")
+                return metrics
+
         logger.info("Calculating all metrics...")
 
-        metrics = {
-            'summary': self.get_summary_metrics(),
-            'action_distribution': self.get_action_distribution(),
-            'rule_effectiveness': self.get_rule_effectiveness(),
-            'geographic_distribution': self.get_geographic_distribution(),
-            'top_blocked_ips': self.get_top_blocked_ips(limit=50),
-            'attack_type_distribution': self.get_attack_type_distribution(),
-            'hourly_patterns': self.get_hourly_traffic_patterns(),
-            'daily_trends': self.get_daily_traffic_trends(),
-            'web_acl_coverage': self.get_web_acl_coverage(),
-            'bot_analysis': self.get_bot_traffic_analysis()
+        # Resolve the emptiness check once so the getters can short-circuit on it
+        if not self._has_data():
+            logger.info("No WAF logs in scope; log-based metrics will be empty")
+
+        tasks = {
+            'summary': (self.get_summary_metrics, {}),
+            'action_distribution': (self.get_action_distribution, {}),
+            'rule_effectiveness': (self.get_rule_effectiveness, {}),
+            'geographic_distribution': (self.get_geographic_distribution, {}),
+            'top_blocked_ips': (self.get_top_blocked_ips, {'limit': 50}),
+            'attack_type_distribution': (self.get_attack_type_distribution, {}),
+            'hourly_patterns': (self.get_hourly_traffic_patterns, {}),
+            'daily_trends': (self.get_daily_traffic_trends, {}),
+            'web_acl_coverage': (self.get_web_acl_coverage, {}),
+            'bot_analysis': (self.get_bot_traffic_analysis, {})
         }
 
+        workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                name: executor.submit(self._run_with_cursor, getter, **kwargs)
+                for name, (getter, kwargs) in tasks.items()
+            }
+            metrics = {name: future.result() for name, future in futures.items()}
+
         logger.info("All metrics calculated successfully")
+
+        if cache_path:
+            self._store_disk_cache(cache_path, metrics)
+
         return metrics
 
+    def _disk_cache_scope(self) -> str:
+        """
+        Identify the database and Web ACL filter that a cache file belongs to.
+
+        Returns:
+            str: Hex digest shared by all cache files for this database and filter
+        """
+        scope = repr((
+            METRICS_CACHE_VERSION,
+            os.path.abspath(self.db.db_path),
+            sorted(self.web_acl_ids) if self.web_acl_ids else None,
+            self.approximate_unique_ips
+        ))
+        return hashlib.sha256(scope.encode('utf-8')).hexdigest()[:16]
+
+    def _disk_cache_path(self) -> Optional[str]:
+        """
+        Build the cache file path for the current database contents.
+
+        Returns:
+            Optional[str]: Cache file path, or None for in-memory databases or if the
+                database state could not be read
+        """
+        # In-memory databases do not outlive the process, so there is nothing to reuse
+        if str(self.db.db_path).startswith(':memory:'):
+            return None
+
+        try:
+            state = self._get_connection().execute(_CACHE_STATE_SQL).fetchone()
+        except Exception as e:
+            logger.warning(f"Could not read database state for metrics cache: {e}")
+            return None
+
+        state_digest = hashlib.sha256(repr(state).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{self._disk_cache_scope()}-{state_digest}.json")
+
+    def _load_disk_cache(self, cache_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a previously stored metrics dataset.
+
+        Args:
+            cache_path (str): Cache file path
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached metrics, or None on a cache miss
+        """
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as fh:
+                return _decode_cache_value(json.load(fh))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable metrics cache {cache_path}: {e}")
+            return None
+
+    def _store_disk_cache(self, cache_path: str, metrics: Dict[str, Any]) -> None:
+        """
+        Persist a metrics dataset and remove stale cache files for the same scope.
+
+        Args:
+            cache_path (str): Cache file path
+            metrics (Dict[str, Any]): Metrics dataset to store
+        """
+        scope_prefix = f"{self._disk_cache_scope()}-"
+        tmp_path = f"{cache_path}.tmp"
+
+        try:
+            payload = _encode_cache_value(metrics)
+        except TypeError as e:
+            logger.warning(f"Metrics not cached: {e}")
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump(payload, fh)
+            os.replace(tmp_path, cache_path)
+
+            for name in os.listdir(self.cache_dir):
+                stale_path = os.path.join(self.cache_dir, name)
+                if name.startswith(scope_prefix) and stale_path != cache_path:
+                    os.remove(stale_path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics cache {cache_path}: {e}")
+
     def get_summary_metrics(self) -> Dict[str, Any]:
         """
-        Get high-level summary metrics.
+        Get high-level summary metrics (memoized per instance).
 
         Returns:
             Dict[str, Any]: Summary metrics
         """
-        logger.info("Calculating summary metrics...")
-
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
+        return self._cached('summary', self._compute_summary_metrics)
 
-        # Total requests
-        query = f"SELECT COUNT(*) as total FROM waf_logs {web_acl_filter}"
-        result = conn.execute(query).fetchone()
-        total_requests = result[0] if result else 0
+    def _compute_summary_metrics(self) -> Dict[str, Any]:
+        """
+        Query the high-level summary metrics.
 
-        # Action counts
-        query = f"""
-            SELECT action, COUNT(*) as count
-            FROM waf_logs
-            {web_acl_filter}
-            GROUP BY action
+        Returns:
+            Dict[str, Any]: Summary metrics
         """
+        logger.info("Calculating summary metrics...")
+
+        if not self._has_data():
+            return {
+                'total_requests': 0,
+                'actions': {},
+                'blocked_requests': 0,
+                'allowed_requests': 0,
+                'block_rate_percent': 0,
+                'unique_client_ips': 0,
+                'unique_countries': 0,
+                'time_range': None
+            }
+
+        conn = self._get_connection()
+        web_acl_filter = self._where_filter
+
+        # Action counts; their sum is the total request count
+        if self.use_summary_tables:
+            query = f"""
+                SELECT action, SUM(request_count) as count
+                FROM waf_summary_hourly
+                {web_acl_filter}
+                GROUP BY action
+            """
+        else:
+            query = f"""
+                SELECT action, COUNT(*) as count
+                FROM waf_logs
+                {web_acl_filter}
+                GROUP BY action
+            """
         result = conn.execute(query).fetchall()
 
         actions = {row[0]: row[1] for row in result}
+        total_requests = sum(actions.values())
 
-        # Time range
+        # Time range, unique clients and unique countries in one scan
         query = f"""
-            SELECT MIN(timestamp) as start, MAX(timestamp) as end
+            SELECT
+                MIN(timestamp) as start,
+                MAX(timestamp) as end,
+                {self._summary_unique_ips_sql} as unique_ips,
+                COUNT(DISTINCT country) FILTER (WHERE country != '-') as unique_countries
             FROM waf_logs
             {web_acl_filter}
         """
@@ -116,26 +529,8 @@ class MetricsCalculator:
                 'start': result[0],
                 'end': result[1]
             }
-
-        # Unique clients
-        where_clause = "WHERE client_ip IS NOT NULL" if not web_acl_filter else f"{web_acl_filter} AND client_ip IS NOT NULL"
-        query = f"""
-            SELECT COUNT(DISTINCT client_ip) as unique_ips
-            FROM waf_logs
-            {where_clause}
-        """
-        result = conn.execute(query).fetchone()
-        unique_ips = result[0] if result else 0
-
-        # Unique countries
-        where_clause = "WHERE country IS NOT NULL AND country != '-'" if not web_acl_filter else f"{web_acl_filter} AND country IS NOT NULL AND country != '-'"
-        query = f"""
-            SELECT COUNT(DISTINCT country) as unique_countries
-            FROM waf_logs
-            {where_clause}
-        """
-        result = conn.execute(query).fetchone()
-        unique_countries = result[0] if result else 0
+        unique_ips = result[2] if result else 0
+        unique_countries = result[3] if result else 0
 
         # Calculate block rate
         blocked = actions.get('BLOCK', 0)
@@ -151,6 +546,9 @@ class MetricsCalculator:
             'unique_countries': unique_countries,
             'time_range': time_range
         }
+        if self.approximate_unique_ips:
+            # Lets reporters label the HyperLogLog figure as an estimate
+            summary['unique_client_ips_estimated'] = True
 
         return summary
 
@@ -161,94 +559,88 @@ class MetricsCalculator:
         Returns:
             Dict[str, Any]: Action distribution data
         """
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
-
-        query = f"""
-            SELECT action, COUNT(*) as count
-            FROM waf_logs
-            {web_acl_filter}
-            GROUP BY action
-            ORDER BY count DESC
-        """
-        result = conn.execute(query).fetchall()
+        if not self._has_data():
+            return {}
+
+        web_acl_filter = self._where_filter
+
+        # Percentages are computed against the grand total with a window aggregate;
+        # they are rounded in Python so ties round half to even as before
+        if self.use_summary_tables:
+            query = f"""
+                SELECT
+                    action,
+                    SUM(request_count) as count,
+                    COALESCE(SUM(request_count)::DOUBLE / NULLIF(SUM(SUM(request_count)) OVER (), 0) * 100, 0) as percentage
+                FROM waf_summary_hourly
+                {web_acl_filter}
+                GROUP BY action
+                ORDER BY count DESC
+            """
+        else:
+            query = f"""
+                SELECT
+                    action,
+                    COUNT(*) as count,
+                    COUNT(*)::DOUBLE / SUM(COUNT(*)) OVER () * 100 as percentage
+                FROM waf_logs
+                {web_acl_filter}
+                GROUP BY action
+                ORDER BY count DESC
+            """
 
-        total = sum(row[1] for row in result)
+        result = self._get_connection().execute(query).fetchall()
 
-        distribution = {}
-        for row in result:
-            action = row[0]
-            count = row[1]
-            percentage = (count / total * 100) if total > 0 else 0
+        return {action: {'count': count, 'percentage': round(percentage, 2)} for action, count, percentage in result}
 
-            distribution[action] = {
-                'count': count,
-                'percentage': round(percentage, 2)
-            }
+    def get_rule_effectiveness(self) -> List[Dict[str, Any]]:
+        """
+        Calculate rule effectiveness metrics (memoized per instance).
 
-        return distribution
+        Returns:
+            List[Dict[str, Any]]: Rule performance metrics
+        """
+        return self._cached('rule_effectiveness', self._compute_rule_effectiveness)
 
-    def get_rule_effectiveness(self) -> List[Dict[str, Any]]:
+    def _compute_rule_effectiveness(self) -> List[Dict[str, Any]]:
         """
-        Calculate rule effectiveness metrics.
+        Query rule effectiveness metrics.
 
         Returns:
             List[Dict[str, Any]]: Rule performance metrics
         """
         logger.info("Calculating rule effectiveness...")
+        if not self._has_data():
+            return []
 
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
-
-        where_clause = "WHERE terminating_rule_id IS NOT NULL" if not web_acl_filter else f"{web_acl_filter} AND terminating_rule_id IS NOT NULL"
+        web_acl_filter = self._where_filter
 
+        # Rows without a terminating rule still count towards the grand total
+        # (window over every group) and are dropped after the window is applied
         query = f"""
             SELECT
-                terminating_rule_id,
-                terminating_rule_type,
-                COUNT(*) as hit_count,
-                COUNT(DISTINCT client_ip) as unique_ips,
-                SUM(CASE WHEN action = 'BLOCK' THEN 1 ELSE 0 END) as blocks,
-                SUM(CASE WHEN action = 'ALLOW' THEN 1 ELSE 0 END) as allows,
-                SUM(CASE WHEN action = 'COUNT' THEN 1 ELSE 0 END) as counts
-            FROM waf_logs
-            {where_clause}
-            GROUP BY terminating_rule_id, terminating_rule_type
+                rule_id, rule_type, hit_count, unique_ips, blocks, allows, counts,
+                hit_count::DOUBLE / total_requests * 100 as hit_rate_percent,
+                blocks::DOUBLE / hit_count * 100 as block_rate_percent
+            FROM (
+                SELECT
+                    terminating_rule_id as rule_id,
+                    terminating_rule_type as rule_type,
+                    COUNT(*) as hit_count,
+                    COUNT(DISTINCT client_ip) as unique_ips,
+                    COUNT(*) FILTER (WHERE action = 'BLOCK') as blocks,
+                    COUNT(*) FILTER (WHERE action = 'ALLOW') as allows,
+                    COUNT(*) FILTER (WHERE action = 'COUNT') as counts,
+                    SUM(COUNT(*)) OVER () as total_requests
+                FROM waf_logs
+                {web_acl_filter}
+                GROUP BY terminating_rule_id, terminating_rule_type
+            )
+            WHERE rule_id IS NOT NULL
             ORDER BY hit_count DESC
         """
-        result = conn.execute(query).fetchall()
 
-        # Get total requests in a single query to avoid multiple full table scans
-        total_query = f"SELECT COUNT(*) as total FROM waf_logs {web_acl_filter}"
-        total_result = conn.execute(total_query).fetchone()
-        total_requests = total_result[0] if total_result else 0
-
-        rules = []
-        for row in result:
-            rule_id = row[0]
-            rule_type = row[1]
-            hit_count = row[2]
-            unique_ips = row[3]
-            blocks = row[4]
-            allows = row[5]
-            counts = row[6]
-
-            hit_rate = (hit_count / total_requests * 100) if total_requests > 0 else 0
-            block_rate = (blocks / hit_count * 100) if hit_count > 0 else 0
-
-            rules.append({
-                'rule_id': rule_id,
-                'rule_type': rule_type,
-                'hit_count': hit_count,
-                'unique_ips': unique_ips,
-                'blocks': blocks,
-                'allows': allows,
-                'counts': counts,
-                'hit_rate_percent': round(hit_rate, 2),
-                'block_rate_percent': round(block_rate, 2)
-            })
-
-        return rules
+        return self._fetch_records(query, round_columns=('hit_rate_percent', 'block_rate_percent'))
 
     def get_geographic_distribution(self) -> List[Dict[str, Any]]:
         """
@@ -257,45 +649,26 @@ class MetricsCalculator:
         Returns:
             List[Dict[str, Any]]: Geographic distribution data
         """
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
+        if not self._has_data():
+            return []
 
-        where_clause = "WHERE country IS NOT NULL AND country != '-'" if not web_acl_filter else f"{web_acl_filter} AND country IS NOT NULL AND country != '-'"
+        where_clause = f"WHERE country IS NOT NULL AND country != '-'{self._and_filter}"
 
         query = f"""
             SELECT
                 country,
                 COUNT(*) as total_requests,
-                SUM(CASE WHEN action = 'BLOCK' THEN 1 ELSE 0 END) as blocked,
-                SUM(CASE WHEN action = 'ALLOW' THEN 1 ELSE 0 END) as allowed,
-                COUNT(DISTINCT client_ip) as unique_ips
+                COUNT(*) FILTER (WHERE action = 'BLOCK') as blocked_requests,
+                COUNT(*) FILTER (WHERE action = 'ALLOW') as allowed_requests,
+                COUNT(DISTINCT client_ip) as unique_ips,
+                (COUNT(*) FILTER (WHERE action = 'BLOCK'))::DOUBLE / COUNT(*) * 100 as threat_score
             FROM waf_logs
             {where_clause}
             GROUP BY country
             ORDER BY total_requests DESC
         """
-        result = conn.execute(query).fetchall()
 
-        countries = []
-        for row in result:
-            country = row[0]
-            total = row[1]
-            blocked = row[2]
-            allowed = row[3]
-            unique_ips = row[4]
-
-            threat_score = (blocked / total * 100) if total > 0 else 0
-
-            countries.append({
-                'country': country,
-                'total_requests': total,
-                'blocked_requests': blocked,
-                'allowed_requests': allowed,
-                'unique_ips': unique_ips,
-                'threat_score': round(threat_score, 2)
-            })
-
-        return countries
+        return self._fetch_records(query, round_columns=('threat_score',))
 
     def get_top_blocked_ips(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -307,39 +680,42 @@ class MetricsCalculator:
         Returns:
             List[Dict[str, Any]]: Top blocked IPs
         """
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
+        if not self._has_data():
+            return []
 
-        where_clause = "WHERE action = 'BLOCK' AND client_ip IS NOT NULL" if not web_acl_filter else f"{web_acl_filter} AND action = 'BLOCK' AND client_ip IS NOT NULL"
+        where_clause = f"WHERE action = 'BLOCK' AND client_ip IS NOT NULL{self._and_filter}"
 
+        # Rank (client_ip, country) groups on the cheap COUNT(*) first, then compute
+        # the distinct-rule and first/last-seen aggregates only for the top groups
         query = f"""
+            WITH top_ips AS (
+                SELECT client_ip, country, COUNT(*) as block_count
+                FROM waf_logs
+                {where_clause}
+                GROUP BY client_ip, country
+                ORDER BY block_count DESC, client_ip, country
+                LIMIT ?
+            ),
+            blocked AS (
+                SELECT client_ip, country, terminating_rule_id, timestamp
+                FROM waf_logs
+                {where_clause}
+            )
             SELECT
-                client_ip,
-                country,
-                COUNT(*) as block_count,
-                COUNT(DISTINCT terminating_rule_id) as unique_rules_hit,
-                MIN(timestamp) as first_seen,
-                MAX(timestamp) as last_seen
-            FROM waf_logs
-            {where_clause}
-            GROUP BY client_ip, country
-            ORDER BY block_count DESC
-            LIMIT {limit}
+                t.client_ip as ip,
+                t.country,
+                t.block_count,
+                COUNT(DISTINCT b.terminating_rule_id) as unique_rules_hit,
+                MIN(b.timestamp) as first_seen,
+                MAX(b.timestamp) as last_seen
+            FROM top_ips t
+            JOIN blocked b
+                ON b.client_ip = t.client_ip AND b.country IS NOT DISTINCT FROM t.country
+            GROUP BY t.client_ip, t.country, t.block_count
+            ORDER BY t.block_count DESC, t.client_ip, t.country
         """
-        result = conn.execute(query).fetchall()
 
-        ips = []
-        for row in result:
-            ips.append({
-                'ip': row[0],
-                'country': row[1],
-                'block_count': row[2],
-                'unique_rules_hit': row[3],
-                'first_seen': row[4],
-                'last_seen': row[5]
-            })
-
-        return ips
+        return self._fetch_records(query, [int(limit)])
 
     def get_attack_type_distribution(self) -> Dict[str, int]:
         """
@@ -348,63 +724,31 @@ class MetricsCalculator:
         Returns:
             Dict[str, int]: Attack type counts
         """
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
+        if not self._has_data():
+            return {}
 
-        where_clause = "WHERE action = 'BLOCK' AND terminating_rule_id IS NOT NULL" if not web_acl_filter else f"{web_acl_filter} AND action = 'BLOCK' AND terminating_rule_id IS NOT NULL"
+        conn = self._get_connection()
+        where_clause = f"WHERE action = 'BLOCK' AND terminating_rule_id IS NOT NULL{self._and_filter}"
 
-        query = f"""
-            SELECT terminating_rule_id, COUNT(*) as count
-            FROM waf_logs
-            {where_clause}
-            GROUP BY terminating_rule_id
-            ORDER BY count DESC
-        """
-        result = conn.execute(query).fetchall()
-
-        # Classify attack types based on rule IDs
-        attack_types = {
-            'SQL Injection': 0,
-            'Cross-Site Scripting': 0,
-            'Scanner/Reconnaissance': 0,
-            'Bot Traffic': 0,
-            'Geographic Block': 0,
-            'Rate Limiting': 0,
-            'IP Reputation': 0,
-            'File Inclusion': 0,
-            'Remote Code Execution': 0,
-            'Other': 0
-        }
+        # Rule IDs are classified by a CASE expression so DuckDB aggregates per attack type
+        if self.use_summary_tables:
+            query = f"""
+                SELECT {_ATTACK_TYPE_CASE_SQL} as attack_type, SUM(request_count) as count
+                FROM waf_summary_rules
+                {where_clause}
+                GROUP BY attack_type
+            """
+        else:
+            query = f"""
+                SELECT {_ATTACK_TYPE_CASE_SQL} as attack_type, COUNT(*) as count
+                FROM waf_logs
+                {where_clause}
+                GROUP BY attack_type
+            """
+        counts = dict(conn.execute(query).fetchall())
 
-        for row in result:
-            rule_id = row[0].lower()
-            count = row[1]
-
-            if 'sqli' in rule_id or 'sql' in rule_id:
-                attack_types['SQL Injection'] += count
-            elif 'xss' in rule_id:
-                attack_types['Cross-Site Scripting'] += count
-            elif 'scanner' in rule_id or 'recon' in rule_id:
-                attack_types['Scanner/Reconnaissance'] += count
-            elif 'bot' in rule_id:
-                attack_types['Bot Traffic'] += count
-            elif 'geo' in rule_id:
-                attack_types['Geographic Block'] += count
-            elif 'rate' in rule_id:
-                attack_types['Rate Limiting'] += count
-            elif 'ip' in rule_id or 'reputation' in rule_id:
-                attack_types['IP Reputation'] += count
-            elif 'rfi' in rule_id or 'lfi' in rule_id:
-                attack_types['File Inclusion'] += count
-            elif 'rce' in rule_id or 'command' in rule_id:
-                attack_types['Remote Code Execution'] += count
-            else:
-                attack_types['Other'] += count
-
-        # Remove zero counts
-        attack_types = {k: v for k, v in attack_types.items() if v > 0}
-
-        return attack_types
+        # Report in precedence order; attack types with no hits are never added
+        return {attack_type: counts[attack_type] for attack_type in _ATTACK_TYPE_ORDER if counts.get(attack_type)}
 
     def get_hourly_traffic_patterns(self) -> List[Dict[str, Any]]:
         """
@@ -413,39 +757,47 @@ class MetricsCalculator:
         Returns:
             List[Dict[str, Any]]: Hourly traffic data
         """
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
-
-        query = f"""
-            SELECT
-                EXTRACT(HOUR FROM timestamp) as hour,
-                COUNT(*) as total_requests,
-                SUM(CASE WHEN action = 'BLOCK' THEN 1 ELSE 0 END) as blocked,
-                SUM(CASE WHEN action = 'COUNT' THEN 1 ELSE 0 END) as counted,
-                SUM(CASE WHEN action = 'ALLOW' THEN 1 ELSE 0 END) as allowed
-            FROM waf_logs
-            {web_acl_filter}
-            GROUP BY hour
-            ORDER BY hour
-        """
-        result = conn.execute(query).fetchall()
-
-        hourly_data = []
-        for row in result:
-            hour = int(row[0])
-            total = row[1]
-            blocked = row[2]
-            allowed = row[4]  # Note: updated index due to added 'counted' column
-
-            hourly_data.append({
-                'hour': hour,
-                'total_requests': total,
-                'blocked': blocked,
-                'allowed': allowed,
-                'block_rate_percent': round((blocked / total * 100) if total > 0 else 0, 2)
-            })
-
-        return hourly_data
+        if not self._has_data():
+            return []
+
+        web_acl_filter = self._where_filter
+
+        if self.use_summary_tables:
+            query = f"""
+                SELECT
+                    hour, total_requests, blocked, allowed,
+                    COALESCE(blocked::DOUBLE / NULLIF(total_requests, 0) * 100, 0) as block_rate_percent
+                FROM (
+                    SELECT
+                        CAST(EXTRACT(HOUR FROM hour_start) AS INTEGER) as hour,
+                        SUM(request_count) as total_requests,
+                        COALESCE(SUM(request_count) FILTER (WHERE action = 'BLOCK'), 0) as blocked,
+                        COALESCE(SUM(request_count) FILTER (WHERE action = 'ALLOW'), 0) as allowed
+                    FROM waf_summary_hourly
+                    {web_acl_filter}
+                    GROUP BY hour
+                )
+                ORDER BY hour
+            """
+        else:
+            query = f"""
+                SELECT
+                    hour, total_requests, blocked, allowed,
+                    blocked::DOUBLE / total_requests * 100 as block_rate_percent
+                FROM (
+                    SELECT
+                        CAST(EXTRACT(HOUR FROM timestamp) AS INTEGER) as hour,
+                        COUNT(*) as total_requests,
+                        COUNT(*) FILTER (WHERE action = 'BLOCK') as blocked,
+                        COUNT(*) FILTER (WHERE action = 'ALLOW') as allowed
+                    FROM waf_logs
+                    {web_acl_filter}
+                    GROUP BY hour
+                )
+                ORDER BY hour
+            """
+
+        return self._fetch_records(query, round_columns=('block_rate_percent',))
 
     def get_daily_traffic_trends(self) -> pd.DataFrame:
         """
@@ -454,16 +806,20 @@ class MetricsCalculator:
         Returns:
             pd.DataFrame: Daily traffic data
         """
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
+        if not self._has_data():
+            return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in _DAILY_TRENDS_DTYPES.items()})
+
+        conn = self._get_connection()
+        web_acl_filter = self._where_filter
 
         query = f"""
             SELECT
                 CAST(timestamp AS DATE) as date,
                 COUNT(*) as total_requests,
-                SUM(CASE WHEN action = 'BLOCK' THEN 1 ELSE 0 END) as blocked,
-                SUM(CASE WHEN action = 'ALLOW' THEN 1 ELSE 0 END) as allowed,
-                COUNT(DISTINCT client_ip) as unique_ips
+                COUNT(*) FILTER (WHERE action = 'BLOCK') as blocked,
+                COUNT(*) FILTER (WHERE action = 'ALLOW') as allowed,
+                COUNT(DISTINCT client_ip) as unique_ips,
+                (COUNT(*) FILTER (WHERE action = 'BLOCK'))::DOUBLE / COUNT(*) * 100 as block_rate_percent
             FROM waf_logs
             {web_acl_filter}
             GROUP BY CAST(timestamp AS DATE)
@@ -471,34 +827,35 @@ class MetricsCalculator:
         """
 
         df = conn.execute(query).df()
-
-        if not df.empty:
-            df['block_rate_percent'] = (df['blocked'] / df['total_requests'] * 100).round(2)
+        df['block_rate_percent'] = df['block_rate_percent'].round(2)
 
         return df
 
     def get_web_acl_coverage(self) -> Dict[str, Any]:
         """
-        Calculate Web ACL coverage metrics.
+        Calculate Web ACL coverage metrics (memoized per instance).
 
         Returns:
             Dict[str, Any]: Coverage metrics
         """
-        conn = self.db.get_connection()
+        return self._cached('web_acl_coverage', self._compute_web_acl_coverage)
 
-        # Total Web ACLs
-        result = conn.execute("SELECT COUNT(*) FROM web_acls").fetchone()
-        total_web_acls = result[0] if result else 0
+    def _compute_web_acl_coverage(self) -> Dict[str, Any]:
+        """
+        Query Web ACL coverage metrics.
 
-        # Web ACLs with logging
-        result = conn.execute("""
-            SELECT COUNT(DISTINCT web_acl_id) FROM logging_configurations
-        """).fetchone()
-        with_logging = result[0] if result else 0
+        Returns:
+            Dict[str, Any]: Coverage metrics
+        """
+        conn = self._get_connection()
 
-        # Total resources
-        result = conn.execute("SELECT COUNT(*) FROM resource_associations").fetchone()
-        total_resources = result[0] if result else 0
+        # Total Web ACLs, Web ACLs with logging and total resources in one round trip
+        total_web_acls, with_logging, total_resources = conn.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM web_acls),
+                (SELECT COUNT(DISTINCT web_acl_id) FROM logging_configurations),
+                (SELECT COUNT(*) FROM resource_associations)
+        """).fetchone()
 
         # Resources by type
         result = conn.execute("""
@@ -526,42 +883,42 @@ class MetricsCalculator:
         Returns:
             Dict[str, Any]: Bot traffic analysis
         """
-        conn = self.db.get_connection()
-        web_acl_filter = self._get_web_acl_filter()
+        if not self._has_data():
+            return {'requests_with_ja3': 0, 'requests_with_ja4': 0, 'top_user_agents': []}
 
-        # Requests with JA3 fingerprints
-        where_clause = "WHERE ja3_fingerprint IS NOT NULL" if not web_acl_filter else f"{web_acl_filter} AND ja3_fingerprint IS NOT NULL"
-        query = f"""
-            SELECT COUNT(*) as count
-            FROM waf_logs
-            {where_clause}
-        """
-        result = conn.execute(query).fetchone()
-        with_ja3 = result[0] if result else 0
+        conn = self._get_connection()
+        web_acl_filter = self._where_filter
 
-        # Requests with JA4 fingerprints
-        where_clause = "WHERE ja4_fingerprint IS NOT NULL" if not web_acl_filter else f"{web_acl_filter} AND ja4_fingerprint IS NOT NULL"
+        # Fingerprint totals and the top user agents share one waf_logs scan: the
+        # per-agent rollup is materialized once and read by both branches
         query = f"""
-            SELECT COUNT(*) as count
-            FROM waf_logs
-            {where_clause}
-        """
-        result = conn.execute(query).fetchone()
-        with_ja4 = result[0] if result else 0
-
-        # Top user agents
-        where_clause = "WHERE user_agent IS NOT NULL" if not web_acl_filter else f"{web_acl_filter} AND user_agent IS NOT NULL"
-        query = f"""
-            SELECT user_agent, COUNT(*) as count
-            FROM waf_logs
-            {where_clause}
-            GROUP BY user_agent
-            ORDER BY count DESC
-            LIMIT 20
-        """
-        result = conn.execute(query).fetchall()
-
-        top_user_agents = [{'user_agent': row[0], 'count': row[1]} for row in result]
+            WITH per_agent AS MATERIALIZED (
+                SELECT
+                    user_agent,
+                    COUNT(*) as count,
+                    COUNT(ja3_fingerprint) as with_ja3,
+                    COUNT(ja4_fingerprint) as with_ja4
+                FROM waf_logs
+                {web_acl_filter}
+                GROUP BY user_agent
+            )
+            SELECT 0 as kind, NULL as user_agent, SUM(with_ja3) as count, SUM(with_ja4) as with_ja4
+            FROM per_agent
+            UNION ALL
+            SELECT * FROM (
+                SELECT 1 as kind, user_agent, count, NULL as with_ja4
+                FROM per_agent
+                WHERE user_agent IS NOT NULL
+                ORDER BY count DESC
+                LIMIT 20
+            )
+            ORDER BY kind, count DESC
+        """
+        rows = conn.execute(query).fetchall()
+
+        with_ja3 = rows[0][2] or 0
+        with_ja4 = rows[0][3] or 0
+        top_user_agents = [{'user_agent': row[1], 'count': row[2]} for row in rows[1:]]
 
         analysis = {
             'requests_with_ja3': with_ja3,
@@ -571,17 +928,28 @@ class MetricsCalculator:
 
         return analysis
 
-    def calculate_security_posture_score(self) -> int:
+    def calculate_security_posture_score(self, metrics: Optional[Dict[str, Any]] = None) -> int:
         """
         Calculate an overall security posture score (0-100).
 
+        Args:
+            metrics (Optional[Dict[str, Any]]): Dataset from calculate_all_metrics(); if None,
+                the summary, rule effectiveness and coverage getters (memoized) are used
+
         Returns:
             int: Security posture score
         """
+        if metrics is None:
+            metrics = {
+                'summary': self.get_summary_metrics(),
+                'rule_effectiveness': self.get_rule_effectiveness(),
+                'web_acl_coverage': self.get_web_acl_coverage()
+            }
+
         score = 100
 
         # Check logging coverage (up to -30 points)
-        coverage = self.get_web_acl_coverage()
+        coverage = metrics['web_acl_coverage']
         logging_coverage = coverage['logging_coverage_percent']
         if logging_coverage < 50:
             score -= 30
@@ -591,8 +959,7 @@ class MetricsCalculator:
             score -= 5
 
         # Check block rate (up to -20 points)
-        summary = self.get_summary_metrics()
-        block_rate = summary['block_rate_percent']
+        block_rate = metrics['summary']['block_rate_percent']
         if block_rate > 50:  # Too high, might indicate false positives
             score -= 20
         elif block_rate > 30:
@@ -601,7 +968,7 @@ class MetricsCalculator:
             score -= 15
 
         # Check rule effectiveness (up to -20 points)
-        rules = self.get_rule_effectiveness()
+        rules = metrics['rule_effectiveness']
         if rules:
             zero_hit_rules = sum(1 for r in rules if r['hit_count'] == 0)
             zero_hit_rate = (zero_hit_rules / len(rules) * 100) if rules else 0
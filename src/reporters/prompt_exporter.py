@@ -159,7 +159,9 @@ class PromptExporter:
             'total_requests': f"{summary.get('total_requests', 0):,}",
             'blocked_requests': f"{summary.get('blocked_requests', 0):,}",
             'block_rate': f"{summary.get('block_rate_percent', 0):.2f}%",
-            'unique_ips': f"{summary.get('unique_client_ips', 0):,}",
+            'unique_ips': (f"~{summary.get('unique_client_ips', 0):,} (estimated, ~10-20% error)"
+                           if summary.get('unique_client_ips_estimated')
+                           else f"{summary.get('unique_client_ips', 0):,}"),
             'unique_countries': f"{summary.get('unique_countries', 0):,}",
             'web_acls_count': len(web_acls),
             'web_acls': web_acls_summary,
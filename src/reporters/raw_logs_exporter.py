@@ -7,9 +7,11 @@ Exports raw AWS WAF logs from CloudWatch to JSON Lines format for external proce
 import logging
 import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, BinaryIO, Optional
 from datetime import datetime
 
+from utils.json_helpers import WRITE_BUFFER_SIZE, dumps_jsonl, write_jsonl
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,11 +53,7 @@ class RawLogsExporter:
 
         try:
             # Export to JSON Lines format (one JSON object per line)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                for event in log_events:
-                    # Write the raw log message
-                    json.dump(event, f, ensure_ascii=False, default=str)
-                    f.write('\n')
+            write_jsonl(filepath, log_events)
 
             logger.info(f"✅ Exported {len(log_events):,} raw log events to: {filepath}")
             logger.info(f"   File format: JSON Lines (.jsonl)")
@@ -85,71 +83,152 @@ class RawLogsExporter:
             logger.warning("No log events to export")
             return {}
 
-        # Create output directory if it doesn't exist
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
+        with self.open_web_acl_stream(output_dir, log_source_name) as writer:
+            writer.write(log_events)
 
-        # Group logs by Web ACL
-        logs_by_web_acl = {}
+        return writer.exported_files
 
-        for event in log_events:
-            # Parse the log message to extract Web ACL info
-            try:
-                # The message field contains the actual WAF log JSON
-                # CloudWatch can use '@message' or 'message' field
-                message = event.get('@message') or event.get('message', '{}')
-                if isinstance(message, str):
-                    log_data = json.loads(message)
-                else:
-                    log_data = message
-
-                # Extract Web ACL ID or ARN
-                web_acl_id = log_data.get('webaclId', 'unknown')
-
-                # Use a short version of the ARN for the filename
-                if '/' in web_acl_id:
-                    web_acl_name = web_acl_id.split('/')[-1]
-                else:
-                    web_acl_name = web_acl_id
-
-                if web_acl_name not in logs_by_web_acl:
-                    logs_by_web_acl[web_acl_name] = []
-
-                logs_by_web_acl[web_acl_name].append(event)
-
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.warning(f"Failed to parse log event for grouping: {e}")
-                # Add to 'unknown' group
-                if 'unknown' not in logs_by_web_acl:
-                    logs_by_web_acl['unknown'] = []
-                logs_by_web_acl['unknown'].append(event)
-
-        # Export each Web ACL's logs to a separate file
-        exported_files = {}
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    def open_web_acl_stream(self, output_dir: str,
+                            log_source_name: str = "cloudwatch") -> 'RawLogsStreamWriter':
+        """
+        Open a writer that appends raw log events to per-Web ACL files page by page.
 
-        for web_acl_name, events in logs_by_web_acl.items():
-            safe_source_name = log_source_name.replace('/', '_').replace(':', '_')
-            safe_web_acl_name = web_acl_name.replace('/', '_').replace(':', '_')
+        Use as a context manager so the output files are flushed and closed:
 
-            filename = f"raw_waf_logs_{safe_web_acl_name}_{safe_source_name}_{timestamp}.jsonl"
-            filepath = output_path / filename
+            with exporter.open_web_acl_stream(output_dir, log_group_name) as writer:
+                for page in pages:
+                    writer.write(page)
 
-            try:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    for event in events:
-                        json.dump(event, f, ensure_ascii=False, default=str)
-                        f.write('\n')
+        Args:
+            output_dir: Output directory path
+            log_source_name: Name of the log source
 
-                logger.info(f"✅ Exported {len(events):,} raw log events for Web ACL '{web_acl_name}' to: {filepath}")
-                exported_files[web_acl_name] = str(filepath)
+        Returns:
+            RawLogsStreamWriter: Incremental per-Web ACL writer
+        """
+        return RawLogsStreamWriter(output_dir, log_source_name)
 
-            except Exception as e:
-                logger.error(f"Failed to export logs for Web ACL '{web_acl_name}': {e}")
 
-        if exported_files:
-            logger.info(f"📁 Exported logs for {len(exported_files)} Web ACL(s)")
-            total_size = sum(Path(f).stat().st_size for f in exported_files.values())
-            logger.info(f"   Total size: {total_size / 1024 / 1024:.2f} MB")
+def _web_acl_name_for_event(event: Dict[str, Any]) -> str:
+    """
+    Extract the short Web ACL name used to group a raw CloudWatch event.
+
+    Args:
+        event: Raw CloudWatch log event
+
+    Returns:
+        str: Web ACL name, or 'unknown' if the message cannot be parsed
+    """
+    try:
+        # The message field contains the actual WAF log JSON
+        # CloudWatch can use '@message' or 'message' field
+        message = event.get('@message') or event.get('message', '{}')
+        if isinstance(message, str):
+            log_data = json.loads(message)
+        else:
+            log_data = message
+
+        # Extract Web ACL ID or ARN
+        web_acl_id = log_data.get('webaclId', 'unknown')
+
+        # Use a short version of the ARN for the filename
+        if '/' in web_acl_id:
+            return web_acl_id.split('/')[-1]
+        return web_acl_id
+
+    except (json.JSONDecodeError, KeyError) as e:
+        logger.warning(f"Failed to parse log event for grouping: {e}")
+        return 'unknown'
+
+
+class RawLogsStreamWriter:
+    """
+    Appends raw CloudWatch log events to one JSON Lines file per Web ACL.
+
+    Files are opened lazily the first time a Web ACL is seen, so only the
+    current page of events has to be held in memory.
+    """
+
+    def __init__(self, output_dir: str, log_source_name: str = "cloudwatch"):
+        """
+        Initialize the stream writer.
 
-        return exported_files
+        Args:
+            output_dir: Output directory path
+            log_source_name: Name of the log source
+        """
+        self.output_path = Path(output_dir)
+        self.safe_source_name = log_source_name.replace('/', '_').replace(':', '_')
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.exported_files: Dict[str, str] = {}
+        self.event_counts: Dict[str, int] = {}
+        self._handles: Dict[str, Optional[BinaryIO]] = {}
+
+    def __enter__(self) -> 'RawLogsStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _get_handle(self, web_acl_name: str) -> Optional[BinaryIO]:
+        """
+        Return the open file for a Web ACL, creating it on first use.
+
+        Args:
+            web_acl_name: Short Web ACL name
+
+        Returns:
+            Optional[BinaryIO]: Open file handle, or None if the file could not be created
+        """
+        if web_acl_name in self._handles:
+            return self._handles[web_acl_name]
+
+        safe_web_acl_name = web_acl_name.replace('/', '_').replace(':', '_')
+        filename = f"raw_waf_logs_{safe_web_acl_name}_{self.safe_source_name}_{self.timestamp}.jsonl"
+        filepath = self.output_path / filename
+
+        try:
+            self.output_path.mkdir(parents=True, exist_ok=True)
+            handle = open(filepath, 'wb', buffering=WRITE_BUFFER_SIZE)
+            self.exported_files[web_acl_name] = str(filepath)
+            self.event_counts[web_acl_name] = 0
+        except Exception as e:
+            logger.error(f"Failed to export logs for Web ACL '{web_acl_name}': {e}")
+            handle = None
+
+        self._handles[web_acl_name] = handle
+        return handle
+
+    def write(self, log_events: List[Dict[str, Any]]) -> None:
+        """
+        Append a page of raw log events to their Web ACL files.
+
+        Args:
+            log_events: Raw log events from CloudWatch
+        """
+        for event in log_events:
+            web_acl_name = _web_acl_name_for_event(event)
+            handle = self._get_handle(web_acl_name)
+            if handle is None:
+                continue
+            handle.write(dumps_jsonl(event))
+            self.event_counts[web_acl_name] += 1
+
+    def close(self) -> None:
+        """
+        Flush and close all open files and log a summary of what was exported.
+        """
+        for web_acl_name, handle in self._handles.items():
+            if handle is None:
+                continue
+            handle.close()
+            logger.info(
+                f"✅ Exported {self.event_counts[web_acl_name]:,} raw log events for Web ACL "
+                f"'{web_acl_name}' to: {self.exported_files[web_acl_name]}"
+            )
+        self._handles = {}
+
+        if self.exported_files:
+            logger.info(f"📁 Exported logs for {len(self.exported_files)} Web ACL(s)")
+            total_size = sum(Path(f).stat().st_size for f in self.exported_files.values())
+            logger.info(f"   Total size: {total_size / 1024 / 1024:.2f} MB")
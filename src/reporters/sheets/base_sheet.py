@@ -43,6 +43,10 @@ class BaseSheet:
             top=Side(style='medium', color='1F4E78'),
             bottom=Side(style='medium', color='1F4E78')
         )
+        # Shared alignments; openpyxl deduplicates styles, so reusing one
+        # instance avoids building a new object for every written cell
+        self.header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+        self.data_alignment = Alignment(vertical='center', wrap_text=False)
         self.viz = None
 
     def _apply_cell_style(self, cell, font=None, fill=None, border=None, alignment=None):
@@ -83,7 +87,7 @@ class BaseSheet:
                 font=self.header_font,
                 fill=self.header_fill,
                 border=self.thin_border,
-                alignment=Alignment(horizontal='center', vertical='center', wrap_text=True)
+                alignment=self.header_alignment
             )
         ws.row_dimensions[row].height = 25
 
@@ -99,7 +103,7 @@ class BaseSheet:
         cell.value = value
         cell.font = self.data_font
         cell.border = self.thin_border
-        cell.alignment = Alignment(vertical='center', wrap_text=False)
+        cell.alignment = self.data_alignment
         # Only apply fill if highlight is True
         if highlight:
             cell.fill = self.highlight_fill
@@ -130,7 +134,7 @@ class BaseSheet:
                     cell.value = value
                     cell.font = self.data_font
                     cell.border = self.thin_border
-                    cell.alignment = Alignment(vertical='center', wrap_text=False)
+                    cell.alignment = self.data_alignment
                     if highlight:
                         cell.fill = self.highlight_fill
             # Apply highlighting to the entire row after insertion
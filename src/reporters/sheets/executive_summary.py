@@ -142,7 +142,9 @@ class ExecutiveSummarySheet(BaseSheet):
             ('Total Requests Analyzed', f"{summary.get('total_requests', 0):,}"),
             ('Blocked Requests', f"{summary.get('blocked_requests', 0):,}"),
             ('Block Rate', f"{summary.get('block_rate_percent', 0):.2f}%"),
-            ('Unique Client IPs', f"{summary.get('unique_client_ips', 0):,}"),
+            (('Unique Client IPs (estimated, ~10-20% error)', f"~{summary.get('unique_client_ips', 0):,}")
+             if summary.get('unique_client_ips_estimated')
+             else ('Unique Client IPs', f"{summary.get('unique_client_ips', 0):,}")),
             ('Unique Countries', f"{summary.get('unique_countries', 0):,}"),
             ('Web ACLs Configured', coverage.get('total_web_acls', 0)),
             ('Protected Resources', coverage.get('total_protected_resources', 0)),
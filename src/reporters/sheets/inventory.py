@@ -2,6 +2,7 @@
 
 import json
 import logging
+from collections import Counter
 from datetime import datetime
 from typing import Any, Dict, List
 from openpyxl.styles import Alignment, Font
@@ -54,11 +55,9 @@ class InventorySheet(BaseSheet):
 
         # Data
         logging_config_ids = {lc.get('web_acl_id') for lc in logging_configs if lc.get('web_acl_id')}
-        resources_count = {}
-        for resource in resources:
-            web_acl_id = resource.get('web_acl_id')
-            if web_acl_id:
-                resources_count[web_acl_id] = resources_count.get(web_acl_id, 0) + 1
+        resources_count = Counter(
+            resource.get('web_acl_id') for resource in resources if resource.get('web_acl_id')
+        )
 
         for idx, acl in enumerate(web_acls):
             acl_id = acl.get('web_acl_id', acl.get('Id', ''))
@@ -110,15 +109,15 @@ class InventorySheet(BaseSheet):
 
         # Calculate rule statistics
         total_rules = sum(len(rules) for rules in rules_by_web_acl.values())
-        rule_types = {}
-        rule_actions = {}
+        rule_types = Counter(
+            rule.get('rule_type', 'UNKNOWN')
+            for rules in rules_by_web_acl.values()
+            for rule in rules
+        )
+        rule_actions = Counter()
 
         for web_acl_id, rules in rules_by_web_acl.items():
             for rule in rules:
-                # Count by type
-                rule_type = rule.get('rule_type', 'UNKNOWN')
-                rule_types[rule_type] = rule_types.get(rule_type, 0) + 1
-
                 # Count by action
                 action = rule.get('action', '')
                 if isinstance(action, str) and action:
@@ -136,9 +135,9 @@ class InventorySheet(BaseSheet):
                             action_key = 'CHALLENGE'
                         else:
                             action_key = 'OTHER'
-                        rule_actions[action_key] = rule_actions.get(action_key, 0) + 1
+                        rule_actions[action_key] += 1
                     except:
-                        rule_actions['UNKNOWN'] = rule_actions.get('UNKNOWN', 0) + 1
+                        rule_actions['UNKNOWN'] += 1
 
         # Summary statistics
         ws[f'A{row}'] = 'Total Rules Configured'
@@ -8,12 +8,109 @@ data insertion, and query execution for AWS WAF analysis data.
 import duckdb
 import logging
 import json
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Column order used when bulk-loading parsed log entries into waf_logs
+WAF_LOG_COLUMNS = [
+    'log_id', 'timestamp', 'web_acl_id', 'web_acl_name', 'action',
+    'client_ip', 'country', 'uri', 'http_method', 'http_version', 'http_status',
+    'terminating_rule_id', 'terminating_rule_type', 'terminating_rule_match_details',
+    'rule_group_list', 'rate_based_rule_list', 'non_terminating_matching_rules',
+    'labels', 'ja3_fingerprint', 'ja4_fingerprint', 'user_agent', 'request_headers',
+    'response_code_sent', 'http_source_name', 'http_source_id', 'raw_log', 'created_at'
+]
+
+# Rows per DataFrame handed to DuckDB's bulk loader
+APPEND_BATCH_SIZE = 50000
+
+# Column definitions of the waf_logs table
+_WAF_LOGS_SCHEMA = """
+    log_id BIGINT PRIMARY KEY,
+    timestamp TIMESTAMP NOT NULL,
+    web_acl_id TEXT,
+    web_acl_name TEXT,
+    action TEXT NOT NULL,
+    client_ip TEXT,
+    country TEXT,
+    uri TEXT,
+    http_method TEXT,
+    http_version TEXT,
+    http_status INTEGER,
+    terminating_rule_id TEXT,
+    terminating_rule_type TEXT,
+    terminating_rule_match_details TEXT,
+    rule_group_list TEXT,
+    rate_based_rule_list TEXT,
+    non_terminating_matching_rules TEXT,
+    labels TEXT,
+    ja3_fingerprint TEXT,
+    ja4_fingerprint TEXT,
+    user_agent TEXT,
+    request_headers TEXT,
+    response_code_sent INTEGER,
+    http_source_name TEXT,
+    http_source_id TEXT,
+    raw_log TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+"""
+
+# Secondary indexes on waf_logs: single-column filters first, then composite
+# indexes for common query patterns
+_WAF_LOGS_INDEXES = (
+    ('idx_logs_timestamp', 'timestamp'),
+    ('idx_logs_web_acl', 'web_acl_id'),
+    ('idx_logs_action', 'action'),
+    ('idx_logs_client_ip', 'client_ip'),
+    ('idx_logs_country', 'country'),
+    ('idx_logs_terminating_rule', 'terminating_rule_id'),
+    ('idx_logs_action_timestamp', 'action, timestamp'),
+    ('idx_logs_web_acl_action', 'web_acl_id, action'),
+    ('idx_logs_client_ip_timestamp', 'client_ip, timestamp'),
+    ('idx_logs_country_action', 'country, action'),
+)
+
+# Physical row order applied by DuckDBManager.cluster_waf_logs(); sorted rows give
+# each row group narrow min/max statistics, so action and time filters skip row groups
+WAF_LOGS_CLUSTER_ORDER = 'action, timestamp'
+
+# Rollups maintained by DuckDBManager.build_summary_tables(), as GROUP BY ALL queries
+# over waf_logs; {where} selects the rows to aggregate (all rows for a full build, the
+# newly inserted log_id range when insert_log_entries() appends to existing rollups)
+_SUMMARY_TABLE_QUERIES = {
+    'waf_summary_hourly': """
+        SELECT
+            web_acl_id,
+            date_trunc('hour', timestamp) AS hour_start,
+            action,
+            COUNT(*) AS request_count
+        FROM waf_logs
+        {where}
+        GROUP BY ALL
+    """,
+    'waf_summary_rules': """
+        SELECT
+            web_acl_id,
+            terminating_rule_id,
+            terminating_rule_type,
+            action,
+            COUNT(*) AS request_count
+        FROM waf_logs
+        {where}
+        GROUP BY ALL
+    """,
+}
+
+# ORDER BY clauses accepted by DuckDBManager.list_web_acls()
+_WEB_ACL_LIST_ORDER = {
+    'name': 'name',
+    'scope': 'scope, name',
+}
+
 
 class DateTimeEncoder(json.JSONEncoder):
     """
@@ -31,6 +128,9 @@ class DuckDBManager:
     Manages DuckDB database operations for WAF analysis.
     """
 
+    # Rollup tables derived from waf_logs by build_summary_tables()
+    SUMMARY_TABLES = tuple(_SUMMARY_TABLE_QUERIES)
+
     def __init__(self, db_path: str = "waf_analysis.duckdb"):
         """
         Initialize the DuckDB manager.
@@ -40,6 +140,9 @@ class DuckDBManager:
         """
         self.db_path = db_path
         self.connection = None
+        # Read caches for the interactive menu; cleared by every write method
+        self._stats_cache: Optional[Dict[str, int]] = None
+        self._web_acl_list_cache: Dict[str, List[Tuple[str, str, str]]] = {}
         logger.info(f"Initializing DuckDB manager with database: {db_path}")
 
     def connect(self) -> duckdb.DuckDBPyConnection:
@@ -63,6 +166,28 @@ class DuckDBManager:
             self.connection = None
             logger.info("DuckDB connection closed")
 
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block of statements in a single explicit transaction.
+
+        Commits when the block succeeds and rolls back if it raises, so a
+        batch of inserts is written with one WAL flush.
+
+        Yields:
+            duckdb.DuckDBPyConnection: Database connection
+        """
+        conn = self.connect()
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            self._invalidate_caches()
+            raise
+        else:
+            conn.execute("COMMIT")
+
     def __enter__(self):
         """Context manager entry."""
         self.connect()
@@ -79,6 +204,7 @@ class DuckDBManager:
         logger.info("Initializing database schema...")
 
         conn = self.connect()
+        self._invalidate_caches()
 
         # Create web_acls table
         conn.execute("""
@@ -127,37 +253,7 @@ class DuckDBManager:
         logger.info("Created table: logging_configurations")
 
         # Create waf_logs table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS waf_logs (
-                log_id BIGINT PRIMARY KEY,
-                timestamp TIMESTAMP NOT NULL,
-                web_acl_id TEXT,
-                web_acl_name TEXT,
-                action TEXT NOT NULL,
-                client_ip TEXT,
-                country TEXT,
-                uri TEXT,
-                http_method TEXT,
-                http_version TEXT,
-                http_status INTEGER,
-                terminating_rule_id TEXT,
-                terminating_rule_type TEXT,
-                terminating_rule_match_details TEXT,
-                rule_group_list TEXT,
-                rate_based_rule_list TEXT,
-                non_terminating_matching_rules TEXT,
-                labels TEXT,
-                ja3_fingerprint TEXT,
-                ja4_fingerprint TEXT,
-                user_agent TEXT,
-                request_headers TEXT,
-                response_code_sent INTEGER,
-                http_source_name TEXT,
-                http_source_id TEXT,
-                raw_log TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS waf_logs ({_WAF_LOGS_SCHEMA})")
         logger.info("Created table: waf_logs")
 
         # Create rules table
@@ -180,21 +276,9 @@ class DuckDBManager:
         # Create indexes for performance
         logger.info("Creating indexes...")
 
-        # Single column indexes
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON waf_logs(timestamp)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_web_acl ON waf_logs(web_acl_id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_action ON waf_logs(action)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_client_ip ON waf_logs(client_ip)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_country ON waf_logs(country)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_terminating_rule ON waf_logs(terminating_rule_id)")
+        self._create_waf_logs_indexes(conn)
         conn.execute("CREATE INDEX IF NOT EXISTS idx_associations_web_acl ON resource_associations(web_acl_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_rules_web_acl ON rules(web_acl_id)")
-        
-        # Composite indexes for common query patterns
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_action_timestamp ON waf_logs(action, timestamp)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_web_acl_action ON waf_logs(web_acl_id, action)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_client_ip_timestamp ON waf_logs(client_ip, timestamp)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_country_action ON waf_logs(country, action)")
 
         logger.info("Database initialization complete")
 
@@ -205,13 +289,27 @@ class DuckDBManager:
         Args:
             web_acl_data (Dict[str, Any]): Web ACL configuration data
         """
-        conn = self.connect()
+        self.insert_web_acls([web_acl_data])
 
-        web_acl_id = web_acl_data.get('Id') or web_acl_data.get('web_acl_id')
         name = web_acl_data.get('Name') or web_acl_data.get('name')
-        scope = web_acl_data.get('Scope') or web_acl_data.get('scope')
+        web_acl_id = web_acl_data.get('Id') or web_acl_data.get('web_acl_id')
+        logger.info(f"Inserted Web ACL: {name} ({web_acl_id})")
 
-        conn.execute("""
+    def insert_web_acls(self, web_acls: List[Dict[str, Any]]) -> None:
+        """
+        Insert or update several Web ACL configurations with a single executemany call.
+
+        Args:
+            web_acls (List[Dict[str, Any]]): Web ACL configuration data
+        """
+        if not web_acls:
+            return
+
+        conn = self.connect()
+        self._invalidate_caches()
+        now = datetime.utcnow()
+
+        conn.executemany("""
             INSERT INTO web_acls (
                 web_acl_id, name, scope, default_action, description,
                 visibility_config, capacity, managed_by_firewall_manager,
@@ -227,19 +325,22 @@ class DuckDBManager:
                 managed_by_firewall_manager = EXCLUDED.managed_by_firewall_manager,
                 updated_at = EXCLUDED.updated_at
         """, [
-            web_acl_id,
-            name,
-            scope,
-            json.dumps(web_acl_data.get('DefaultAction', {})),
-            web_acl_data.get('Description', ''),
-            json.dumps(web_acl_data.get('VisibilityConfig', {})),
-            web_acl_data.get('Capacity', 0),
-            web_acl_data.get('ManagedByFirewallManager', False),
-            web_acl_data.get('CreatedAt') or datetime.utcnow(),
-            datetime.utcnow()
+            [
+                web_acl_data.get('Id') or web_acl_data.get('web_acl_id'),
+                web_acl_data.get('Name') or web_acl_data.get('name'),
+                web_acl_data.get('Scope') or web_acl_data.get('scope'),
+                json.dumps(web_acl_data.get('DefaultAction', {})),
+                web_acl_data.get('Description', ''),
+                json.dumps(web_acl_data.get('VisibilityConfig', {})),
+                web_acl_data.get('Capacity', 0),
+                web_acl_data.get('ManagedByFirewallManager', False),
+                web_acl_data.get('CreatedAt') or now,
+                now
+            ]
+            for web_acl_data in web_acls
         ])
 
-        logger.info(f"Inserted Web ACL: {name} ({web_acl_id})")
+        logger.debug(f"Upserted {len(web_acls)} Web ACLs")
 
     def insert_rules(self, web_acl_id: str, rules: List[Dict[str, Any]]) -> None:
         """
@@ -249,26 +350,29 @@ class DuckDBManager:
             web_acl_id (str): Web ACL ID
             rules (List[Dict[str, Any]]): List of rule configurations
         """
-        conn = self.connect()
+        if not rules:
+            return
 
-        for rule in rules:
-            rule_id = f"{web_acl_id}_{rule.get('Name', 'unknown')}"
+        conn = self.connect()
+        self._invalidate_caches()
+        now = datetime.utcnow()
 
-            conn.execute("""
-                INSERT INTO rules (
-                    rule_id, web_acl_id, name, priority, rule_type,
-                    action, visibility_config, statement, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT (rule_id) DO UPDATE SET
-                    name = EXCLUDED.name,
-                    priority = EXCLUDED.priority,
-                    rule_type = EXCLUDED.rule_type,
-                    action = EXCLUDED.action,
-                    visibility_config = EXCLUDED.visibility_config,
-                    statement = EXCLUDED.statement,
-                    created_at = EXCLUDED.created_at
-            """, [
-                rule_id,
+        conn.executemany("""
+            INSERT INTO rules (
+                rule_id, web_acl_id, name, priority, rule_type,
+                action, visibility_config, statement, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (rule_id) DO UPDATE SET
+                name = EXCLUDED.name,
+                priority = EXCLUDED.priority,
+                rule_type = EXCLUDED.rule_type,
+                action = EXCLUDED.action,
+                visibility_config = EXCLUDED.visibility_config,
+                statement = EXCLUDED.statement,
+                created_at = EXCLUDED.created_at
+        """, [
+            [
+                f"{web_acl_id}_{rule.get('Name', 'unknown')}",
                 web_acl_id,
                 rule.get('Name', ''),
                 rule.get('Priority', 0),
@@ -276,8 +380,10 @@ class DuckDBManager:
                 json.dumps(rule.get('Action', {})),
                 json.dumps(rule.get('VisibilityConfig', {})),
                 json.dumps(rule.get('Statement', {})),
-                datetime.utcnow()
-            ])
+                now
+            ]
+            for rule in rules
+        ])
 
         logger.info(f"Inserted {len(rules)} rules for Web ACL: {web_acl_id}")
 
@@ -291,20 +397,37 @@ class DuckDBManager:
             resource_arn (str): Resource ARN
             resource_type (str): Type of resource (ALB, API_GATEWAY, CLOUDFRONT)
         """
-        conn = self.connect()
+        self.insert_resource_associations(web_acl_id, [(resource_arn, resource_type)])
 
-        association_id = f"{web_acl_id}_{resource_arn}"
+    def insert_resource_associations(self, web_acl_id: str,
+                                     associations: List[Tuple[str, str]]) -> None:
+        """
+        Insert resource associations for a Web ACL in one batch.
 
-        conn.execute("""
+        Args:
+            web_acl_id (str): Web ACL ID
+            associations (List[Tuple[str, str]]): (resource_arn, resource_type) pairs
+        """
+        if not associations:
+            return
+
+        conn = self.connect()
+        self._invalidate_caches()
+        now = datetime.utcnow()
+
+        conn.executemany("""
             INSERT INTO resource_associations (
                 association_id, web_acl_id, resource_arn, resource_type, created_at
             ) VALUES (?, ?, ?, ?, ?)
             ON CONFLICT (association_id) DO UPDATE SET
                 resource_type = EXCLUDED.resource_type,
                 created_at = EXCLUDED.created_at
-        """, [association_id, web_acl_id, resource_arn, resource_type, datetime.utcnow()])
+        """, [
+            [f"{web_acl_id}_{resource_arn}", web_acl_id, resource_arn, resource_type, now]
+            for resource_arn, resource_type in associations
+        ])
 
-        logger.debug(f"Inserted resource association: {resource_type} - {resource_arn}")
+        logger.debug(f"Inserted {len(associations)} resource associations for Web ACL: {web_acl_id}")
 
     def insert_logging_configuration(self, web_acl_id: str, logging_config: Dict[str, Any]) -> None:
         """
@@ -315,6 +438,7 @@ class DuckDBManager:
             logging_config (Dict[str, Any]): Logging configuration data
         """
         conn = self.connect()
+        self._invalidate_caches()
 
         destinations = logging_config.get('LogDestinationConfigs', [])
 
@@ -369,8 +493,13 @@ class DuckDBManager:
             logger.warning("No log entries to insert")
             return 0
 
+        import pandas as pd
+
         conn = self.connect()
 
+        # New rows make cached row counts stale; existing rollups are extended below
+        self._invalidate_caches()
+
         # Determine starting log_id to avoid primary key collisions
         try:
             current_max = conn.execute("SELECT COALESCE(MAX(log_id), -1) FROM waf_logs").fetchone()[0]
@@ -385,18 +514,29 @@ class DuckDBManager:
 
         # Prepare data for bulk insert
         insert_data = []
+        now = datetime.utcnow()
         for idx, entry in enumerate(log_entries):
+            http_request = entry.get('httpRequest', {})
+            headers = http_request.get('headers', [])
+
+            # Parsed entries already carry the User-Agent; only search headers otherwise
+            if 'userAgent' in entry:
+                user_agent = entry['userAgent']
+            else:
+                user_agent = next((header.get('value') for header in headers
+                                   if (header.get('name') or '').lower() == 'user-agent'), None)
+
             insert_data.append([
                 start_id + idx,
                 entry.get('timestamp'),
                 entry.get('webaclId'),
                 entry.get('webaclName'),
                 entry.get('action'),
-                entry.get('clientIp') or entry.get('httpRequest', {}).get('clientIp'),
-                entry.get('country') or entry.get('httpRequest', {}).get('country'),
-                entry.get('uri') or entry.get('httpRequest', {}).get('uri'),
-                entry.get('httpMethod') or entry.get('httpRequest', {}).get('httpMethod'),
-                entry.get('httpVersion') or entry.get('httpRequest', {}).get('httpVersion'),
+                entry.get('clientIp') or http_request.get('clientIp'),
+                entry.get('country') or http_request.get('country'),
+                entry.get('uri') or http_request.get('uri'),
+                entry.get('httpMethod') or http_request.get('httpMethod'),
+                entry.get('httpVersion') or http_request.get('httpVersion'),
                 entry.get('httpStatus'),
                 entry.get('terminatingRuleId'),
                 entry.get('terminatingRuleType'),
@@ -407,27 +547,37 @@ class DuckDBManager:
                 json.dumps(entry.get('labels', []), cls=DateTimeEncoder),
                 entry.get('ja3Fingerprint'),
                 entry.get('ja4Fingerprint'),
-                # Extract user agent from headers if present - more efficient approach
-                (lambda headers: next((header.get('value') for header in headers if header.get('name', '').lower() == 'user-agent'), None))(entry.get('httpRequest', {}).get('headers', [])),
-                json.dumps(entry.get('httpRequest', {}).get('headers', []), cls=DateTimeEncoder),
+                user_agent,
+                json.dumps(headers, cls=DateTimeEncoder),
                 entry.get('responseCodeSent'),
                 entry.get('httpSourceName'),
                 entry.get('httpSourceId'),
                 json.dumps(entry, cls=DateTimeEncoder),
-                datetime.utcnow()
+                now
             ])
 
-        # Use executemany for bulk insert
-        conn.executemany("""
-            INSERT INTO waf_logs (
-                log_id, timestamp, web_acl_id, web_acl_name, action,
-                client_ip, country, uri, http_method, http_version, http_status,
-                terminating_rule_id, terminating_rule_type, terminating_rule_match_details,
-                rule_group_list, rate_based_rule_list, non_terminating_matching_rules,
-                labels, ja3_fingerprint, ja4_fingerprint, user_agent, request_headers,
-                response_code_sent, http_source_name, http_source_id, raw_log, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, insert_data)
+        # Bulk load through a registered DataFrame so DuckDB ingests whole
+        # column vectors instead of binding parameters row by row
+        column_list = ', '.join(WAF_LOG_COLUMNS)
+        try:
+            for batch_start in range(0, len(insert_data), APPEND_BATCH_SIZE):
+                batch = pd.DataFrame(
+                    insert_data[batch_start:batch_start + APPEND_BATCH_SIZE],
+                    columns=WAF_LOG_COLUMNS,
+                    dtype=object
+                )
+                conn.register('waf_logs_batch', batch)
+                try:
+                    conn.execute(f"INSERT INTO waf_logs ({column_list}) SELECT {column_list} FROM waf_logs_batch")
+                finally:
+                    conn.unregister('waf_logs_batch')
+        except Exception:
+            # Rows stored before the failure are missing from the rollups
+            self.drop_summary_tables()
+            raise
+
+        if self.has_summary_tables():
+            self._append_summary_rows(start_id)
 
         logger.info(f"Inserted {len(log_entries)} log entries")
         return len(log_entries)
@@ -446,6 +596,9 @@ class DuckDBManager:
         conn = self.connect()
         logger.debug(f"Executing query: {query[:100]}...")
 
+        # Arbitrary SQL may modify tables
+        self._invalidate_caches()
+
         if params:
             result = conn.execute(query, params)
         else:
@@ -477,13 +630,22 @@ class DuckDBManager:
         logger.info(f"Table '{table_name}' has {count} records")
         return count
 
-    def get_database_stats(self) -> Dict[str, int]:
+    def get_database_stats(self, refresh: bool = False) -> Dict[str, int]:
         """
         Get statistics about the database.
 
+        Counts are cached until the next write through this manager, so the
+        interactive menu can check them repeatedly without re-counting.
+
+        Args:
+            refresh (bool): Ignore the cached counts and query the tables again
+
         Returns:
             Dict[str, int]: Dictionary with table names and record counts
         """
+        if self._stats_cache is not None and not refresh:
+            return dict(self._stats_cache)
+
         tables = ['web_acls', 'resource_associations', 'logging_configurations', 'waf_logs', 'rules']
         stats = {}
 
@@ -494,7 +656,168 @@ class DuckDBManager:
                 logger.warning(f"Could not get count for table {table}: {e}")
                 stats[table] = 0
 
-        return stats
+        self._stats_cache = stats
+        return dict(stats)
+
+    def has_web_acls(self) -> bool:
+        """
+        Check whether any Web ACL has been stored.
+
+        Cheaper than get_database_stats() when only existence matters, as the
+        scan stops at the first row.
+
+        Returns:
+            bool: True if the web_acls table has at least one row
+        """
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT 1 FROM web_acls LIMIT 1").fetchone() is not None
+        except Exception as e:
+            logger.warning(f"Could not check web_acls table: {e}")
+            return False
+
+    def list_web_acls(self, order_by: str = 'name') -> List[Tuple[str, str, str]]:
+        """
+        List stored Web ACLs for selection menus.
+
+        Results are cached until the next write through this manager.
+
+        Args:
+            order_by (str): 'name' or 'scope' (scope, then name)
+
+        Returns:
+            List[Tuple[str, str, str]]: (web_acl_id, name, scope) tuples
+        """
+        if order_by not in _WEB_ACL_LIST_ORDER:
+            raise ValueError(f"Unsupported order_by: {order_by}")
+
+        if order_by not in self._web_acl_list_cache:
+            conn = self.connect()
+            self._web_acl_list_cache[order_by] = conn.execute(
+                f"SELECT web_acl_id, name, scope FROM web_acls ORDER BY {_WEB_ACL_LIST_ORDER[order_by]}"
+            ).fetchall()
+
+        return list(self._web_acl_list_cache[order_by])
+
+    def _invalidate_caches(self) -> None:
+        """
+        Discard cached row counts and Web ACL listings after a write.
+        """
+        self._stats_cache = None
+        self._web_acl_list_cache.clear()
+
+    def _create_waf_logs_indexes(self, conn: duckdb.DuckDBPyConnection) -> None:
+        """
+        Create the secondary indexes on waf_logs if they do not exist.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): Database connection
+        """
+        for index_name, columns in _WAF_LOGS_INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON waf_logs({columns})")
+
+    def cluster_waf_logs(self) -> None:
+        """
+        Rewrite waf_logs in WAF_LOGS_CLUSTER_ORDER.
+
+        Appended batches interleave every action, so DuckDB's per-row-group
+        min/max statistics cannot exclude anything. The table is rebuilt
+        sorted in one transaction and its indexes are recreated; the rows
+        themselves (including log_id) are unchanged.
+        """
+        logger.info("Clustering waf_logs...")
+        column_list = ', '.join(WAF_LOG_COLUMNS)
+
+        with self.transaction() as conn:
+            conn.execute("DROP TABLE IF EXISTS waf_logs_clustered")
+            conn.execute(f"CREATE TABLE waf_logs_clustered ({_WAF_LOGS_SCHEMA})")
+            conn.execute(
+                f"INSERT INTO waf_logs_clustered ({column_list}) "
+                f"SELECT {column_list} FROM waf_logs ORDER BY {WAF_LOGS_CLUSTER_ORDER}"
+            )
+            conn.execute("DROP TABLE waf_logs")
+            conn.execute("ALTER TABLE waf_logs_clustered RENAME TO waf_logs")
+            self._create_waf_logs_indexes(conn)
+
+        logger.info("waf_logs clustered")
+
+    def build_summary_tables(self) -> None:
+        """
+        Materialize rollup tables of waf_logs for the metrics calculator.
+
+        Each rollup is keyed on web_acl_id, so Web ACL filters still apply, and
+        count-only metrics read these small tables instead of rescanning the raw
+        logs. The first call builds them with one GROUP BY pass over waf_logs;
+        afterwards insert_log_entries() appends the aggregates of each inserted
+        batch, and later calls only merge those appended rows, so an ingest does
+        not re-aggregate the whole table.
+        """
+        conn = self.connect()
+
+        # Per-IP daily rollup from earlier versions; nearly as large as waf_logs itself
+        conn.execute("DROP TABLE IF EXISTS waf_summary_daily_ips")
+
+        if self.has_summary_tables():
+            logger.info("Compacting summary tables...")
+            for table in self.SUMMARY_TABLES:
+                conn.execute(f"""
+                    CREATE OR REPLACE TABLE {table} AS
+                    SELECT * EXCLUDE (request_count), SUM(request_count)::BIGINT AS request_count
+                    FROM {table}
+                    GROUP BY ALL
+                """)
+            logger.info(f"Compacted summary tables: {', '.join(self.SUMMARY_TABLES)}")
+            return
+
+        logger.info("Building summary tables...")
+        for table, query in _SUMMARY_TABLE_QUERIES.items():
+            conn.execute(f"CREATE OR REPLACE TABLE {table} AS {query.format(where='')}")
+
+        logger.info(f"Built summary tables: {', '.join(self.SUMMARY_TABLES)}")
+
+    def _append_summary_rows(self, start_id: int) -> None:
+        """
+        Add the aggregates of newly inserted logs to the existing rollup tables.
+
+        Groups that already exist get a second row; build_summary_tables()
+        merges them, and the metric queries sum request_count either way. If
+        the rollups cannot be extended they are dropped, so they are rebuilt
+        from waf_logs on the next build_summary_tables() call.
+
+        Args:
+            start_id (int): First log_id of the inserted rows
+        """
+        conn = self.connect()
+        try:
+            for table, query in _SUMMARY_TABLE_QUERIES.items():
+                conn.execute(f"INSERT INTO {table} {query.format(where='WHERE log_id >= ?')}", [start_id])
+        except Exception as e:
+            logger.warning(f"Could not update summary tables, dropping them: {e}")
+            self.drop_summary_tables()
+
+    def drop_summary_tables(self) -> None:
+        """
+        Drop the rollup tables created by build_summary_tables().
+        """
+        conn = self.connect()
+        for table in self.SUMMARY_TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def has_summary_tables(self) -> bool:
+        """
+        Check whether all rollup tables are present.
+
+        Returns:
+            bool: True if build_summary_tables() has created the rollups (insert_log_entries()
+                keeps them current; a Web ACL ID migration drops them)
+        """
+        conn = self.connect()
+        placeholders = ', '.join('?' for _ in self.SUMMARY_TABLES)
+        result = conn.execute(
+            f"SELECT COUNT(*) FROM duckdb_tables() WHERE table_name IN ({placeholders})",
+            list(self.SUMMARY_TABLES)
+        ).fetchone()
+        return result[0] == len(self.SUMMARY_TABLES)
 
     def vacuum(self) -> None:
         """
@@ -534,6 +857,7 @@ class DuckDBManager:
                     WHERE web_acl_id LIKE 'arn:aws:wafv2:%'
                 """)
                 logger.info(f"Migrated {arn_count} log entries from ARN to ID format")
+                self.drop_summary_tables()
             else:
                 logger.info("No log entries with ARN format found, no migration needed")
             
@@ -7,11 +7,27 @@ profile detection, region management, and account information retrieval.
 
 import boto3
 import logging
+from functools import lru_cache
 from typing import Optional, Dict, Any
+from botocore.config import Config
 from botocore.exceptions import ClientError, ProfileNotFound, NoCredentialsError
 
 logger = logging.getLogger(__name__)
 
+# Default HTTP connection pool size for S3 clients used by parallel downloads
+S3_MAX_POOL_CONNECTIONS = 32
+
+# WAFv2 clients are shared by concurrent configuration fetches; adaptive
+# retries back off client-side when the WAF API starts throttling
+WAFV2_CLIENT_CONFIG = Config(
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    max_pool_connections=32
+)
+
+# Session information from the last complete get_session_info() lookup;
+# failed or partial lookups are never stored
+_session_info_cache: Optional[Dict[str, Any]] = None
+
 
 def get_current_aws_profile() -> Optional[str]:
     """
@@ -133,7 +149,8 @@ def get_wafv2_client(scope: str = 'REGIONAL') -> boto3.client:
         boto3.client: Configured WAFv2 client
 
     Note:
-        CloudFront WAF ACLs must use us-east-1 region
+        CloudFront WAF ACLs must use us-east-1 region. Clients are cached per
+        region, so processors for the same scope share one client.
     """
     if scope == 'CLOUDFRONT':
         region = 'us-east-1'
@@ -142,7 +159,21 @@ def get_wafv2_client(scope: str = 'REGIONAL') -> boto3.client:
         region = get_current_region()
         logger.info(f"Creating WAFv2 client for Regional scope ({region})")
 
-    return boto3.client('wafv2', region_name=region)
+    return _get_wafv2_client_for_region(region)
+
+
+@lru_cache(maxsize=8)
+def _get_wafv2_client_for_region(region: str) -> boto3.client:
+    """
+    Create (once per region) a WAFv2 client; boto3 clients are thread-safe and reusable.
+
+    Args:
+        region (str): AWS region name
+
+    Returns:
+        boto3.client: Shared WAFv2 client for the region
+    """
+    return boto3.client('wafv2', region_name=region, config=WAFV2_CLIENT_CONFIG)
 
 
 def get_logs_client(region: Optional[str] = None) -> boto3.client:
@@ -159,18 +190,36 @@ def get_logs_client(region: Optional[str] = None) -> boto3.client:
         region = get_current_region()
 
     logger.info(f"Creating CloudWatch Logs client for region: {region}")
+    return _get_logs_client_for_region(region)
+
+
+@lru_cache(maxsize=8)
+def _get_logs_client_for_region(region: str) -> boto3.client:
+    """
+    Create (once per region) a CloudWatch Logs client.
+
+    Args:
+        region (str): AWS region name
+
+    Returns:
+        boto3.client: Shared CloudWatch Logs client for the region
+    """
     return boto3.client('logs', region_name=region)
 
 
-def get_s3_client() -> boto3.client:
+def get_s3_client(max_pool_connections: int = S3_MAX_POOL_CONNECTIONS) -> boto3.client:
     """
     Create an S3 client.
 
+    Args:
+        max_pool_connections (int): HTTP connection pool size; should be at least
+            the number of threads downloading objects concurrently
+
     Returns:
         boto3.client: Configured S3 client
     """
     logger.info("Creating S3 client")
-    return boto3.client('s3')
+    return boto3.client('s3', config=Config(max_pool_connections=max_pool_connections))
 
 
 def parse_arn(arn: str) -> Dict[str, str]:
@@ -193,6 +242,23 @@ def parse_arn(arn: str) -> Dict[str, str]:
             'account_id': '123456789012',
             'resource': 'regional/webacl/test/a1b2c3d4'
         }
+
+    Note:
+        Results are memoized per ARN; each call returns a fresh copy of the dict.
+    """
+    return dict(_parse_arn_cached(arn))
+
+
+@lru_cache(maxsize=4096)
+def _parse_arn_cached(arn: str) -> Dict[str, str]:
+    """
+    Split an ARN into its components (cached by parse_arn).
+
+    Args:
+        arn (str): AWS ARN string
+
+    Returns:
+        Dict[str, str]: Dictionary with ARN components, or empty dict if invalid
     """
     parts = arn.split(':')
 
@@ -210,10 +276,13 @@ def parse_arn(arn: str) -> Dict[str, str]:
     }
 
 
+@lru_cache(maxsize=4096)
 def determine_resource_type(arn: str) -> str:
     """
     Determine the resource type from an ARN.
 
+    Results are memoized per ARN, so an unknown ARN is only logged once.
+
     Args:
         arn (str): AWS resource ARN
 
@@ -254,10 +323,38 @@ def handle_aws_error(error: ClientError, operation: str) -> None:
         logger.error("The requested AWS resource was not found.")
 
 
-def get_session_info() -> Dict[str, Any]:
+def get_session_info(refresh: bool = False) -> Dict[str, Any]:
     """
     Get comprehensive information about the current AWS session.
 
+    The underlying STS/IAM lookups are cached for the process once they succeed
+    with valid credentials; failed lookups are retried on the next call. Each
+    call returns a fresh copy so callers may add keys without affecting the
+    cached value.
+
+    Args:
+        refresh (bool): Discard the cached result and query AWS again
+
+    Returns:
+        Dict[str, Any]: Session information including profile, region, account ID, alias, and identity
+    """
+    global _session_info_cache
+
+    if refresh:
+        _session_info_cache = None
+    if _session_info_cache is not None:
+        return dict(_session_info_cache)
+
+    session_info = _fetch_session_info()
+    if session_info['credentials_valid'] and session_info['account_id'] and session_info.get('arn'):
+        _session_info_cache = session_info
+    return dict(session_info)
+
+
+def _fetch_session_info() -> Dict[str, Any]:
+    """
+    Query AWS for the current session information (cached by get_session_info).
+
     Returns:
         Dict[str, Any]: Session information including profile, region, account ID, alias, and identity
     """
@@ -0,0 +1,92 @@
+"""
+JSON Helper Functions
+
+This module provides fast JSON (de)serialization helpers used when parsing
+and persisting large volumes of WAF log events. It uses orjson when
+installed and falls back to the standard library otherwise.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterable, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Buffer size for JSON Lines output files (1 MiB)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def dumps_jsonl(record: Any) -> bytes:
+    """
+    Serialize a single record as one UTF-8 encoded JSON Lines row.
+
+    Args:
+        record (Any): JSON-serializable record; unknown types are converted with str()
+
+    Returns:
+        bytes: Serialized record terminated by a newline
+    """
+    if orjson is not None:
+        return orjson.dumps(record, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+
+def dumps_json(record: Any) -> str:
+    """
+    Serialize a single record as a compact JSON document.
+
+    Args:
+        record (Any): JSON-serializable record; unknown types are converted with str()
+
+    Returns:
+        str: Serialized record
+    """
+    if orjson is not None:
+        return orjson.dumps(record, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(record, ensure_ascii=False, default=str, separators=(',', ':'))
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Deserialize a JSON document, using orjson when available.
+
+    Args:
+        data (Union[str, bytes]): JSON text
+
+    Returns:
+        Any: Decoded value
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON (orjson's error is a subclass)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_jsonl(file_path: Union[str, Path], records: Iterable[Any]) -> int:
+    """
+    Write records to a JSON Lines file (one JSON object per line).
+
+    Args:
+        file_path (Union[str, Path]): Destination file path
+        records (Iterable[Any]): JSON-serializable records; unknown types are converted with str()
+
+    Returns:
+        int: Number of records written
+    """
+    count = 0
+
+    with open(file_path, 'wb', buffering=WRITE_BUFFER_SIZE) as fh:
+        for record in records:
+            fh.write(dumps_jsonl(record))
+            count += 1
+
+    logger.debug(f"Wrote {count} records to {file_path}")
+    return count
@@ -69,7 +69,7 @@ def timestamp_to_datetime(timestamp: int) -> datetime:
     else:  # Seconds
         dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
 
-    logger.debug(f"Converted timestamp {timestamp} to {dt.isoformat()}")
+    logger.debug("Converted timestamp %s to %s", timestamp, dt)
     return dt
 
 
@@ -89,12 +89,12 @@ def parse_iso_timestamp(timestamp_str: str) -> Optional[datetime]:
         # Ensure timezone-aware
         if dt.tzinfo is None:
             dt = dt.replace(tzinfo=timezone.utc)
-            logger.warning(f"Timestamp {timestamp_str} was timezone-naive, assumed UTC")
+            logger.warning("Timestamp %s was timezone-naive, assumed UTC", timestamp_str)
 
-        logger.debug(f"Parsed timestamp: {timestamp_str} -> {dt.isoformat()}")
+        logger.debug("Parsed timestamp: %s -> %s", timestamp_str, dt)
         return dt
     except (ValueError, TypeError) as e:
-        logger.error(f"Failed to parse timestamp '{timestamp_str}': {e}")
+        logger.error("Failed to parse timestamp '%s': %s", timestamp_str, e)
         return None
 
 
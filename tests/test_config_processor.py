@@ -0,0 +1,74 @@
+"""
+Tests for WAFConfigProcessor resource lookups.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from processors import config_processor  # noqa: E402
+from processors.config_processor import WAFConfigProcessor  # noqa: E402
+
+STALE_ARN = 'arn:aws:wafv2:us-east-1:123456789012:regional/webacl/stale/1111'
+GOOD_ARN = 'arn:aws:wafv2:us-east-1:123456789012:regional/webacl/good/2222'
+ALB_ARN = 'arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/web/abc'
+
+
+def _client_error(code, message, **extra):
+    response = {'Error': {'Code': code, 'Message': message}}
+    response.update(extra)
+    return ClientError(response, 'ListResourcesForWebACL')
+
+
+class ResourceTypeCacheTest(unittest.TestCase):
+    def setUp(self):
+        config_processor._unsupported_resource_types.clear()
+        self.addCleanup(config_processor._unsupported_resource_types.clear)
+
+        self.client = mock.Mock()
+        self.client.meta.region_name = 'us-east-1'
+        patcher = mock.patch.object(config_processor, 'get_wafv2_client', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.processor = WAFConfigProcessor(scope='REGIONAL')
+
+    def test_arn_error_does_not_hide_type_for_next_web_acl(self):
+        def list_resources(WebACLArn, ResourceType, **kwargs):
+            if WebACLArn == STALE_ARN:
+                raise _client_error('WAFInvalidParameterException', 'Invalid ARN',
+                                    Field='RESOURCE_ARN', Parameter=STALE_ARN)
+            if ResourceType == 'APPLICATION_LOAD_BALANCER':
+                return {'ResourceArns': [ALB_ARN]}
+            return {'ResourceArns': []}
+
+        self.client.list_resources_for_web_acl.side_effect = list_resources
+
+        self.assertEqual(self.processor.get_resources_for_web_acl(STALE_ARN), [])
+        self.assertEqual(self.processor.get_resources_for_web_acl(GOOD_ARN), [ALB_ARN])
+
+    def test_invalid_resource_type_is_skipped_for_later_web_acls(self):
+        def list_resources(WebACLArn, ResourceType, **kwargs):
+            if ResourceType == 'VERIFIED_ACCESS_INSTANCE':
+                raise _client_error('WAFInvalidParameterException', 'Invalid resource type',
+                                    Field='RESOURCE_TYPE', Parameter=ResourceType)
+            return {'ResourceArns': []}
+
+        self.client.list_resources_for_web_acl.side_effect = list_resources
+
+        self.processor.get_resources_for_web_acl(STALE_ARN)
+        self.processor.get_resources_for_web_acl(GOOD_ARN)
+
+        checked = [call.kwargs['ResourceType'] for call in self.client.list_resources_for_web_acl.call_args_list]
+        self.assertEqual(checked.count('VERIFIED_ACCESS_INSTANCE'), 1)
+        self.assertEqual(checked.count('APPLICATION_LOAD_BALANCER'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()